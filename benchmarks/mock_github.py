@@ -0,0 +1,301 @@
+# mock_github.py
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+ME = 'bench-user'
+TARGET = 'bench-target'
+
+
+class MockGraph:
+    """
+    Synthetic social graph with `size` users:
+    - you follow every user; every other user follows you back
+    - TARGET has `size` followers, half of them already followed by you
+    - every user owns three repositories, every third one has a README repo (user/user)
+    - you have starred size // 10 repositories
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        users = [f'user{i}' for i in range(size)]
+        self.ids = {login: i + 1 for i, login in enumerate(users)}
+        self.ids[ME] = size + 1
+        self.ids[TARGET] = size + 2
+        # Dicts double as insertion-ordered sets for O(1) follow/unfollow
+        self.following = {ME: dict.fromkeys(users)}
+        self.followers = {
+            ME: dict.fromkeys(users[::2]),
+            TARGET: dict.fromkeys(users[size // 2:] + [f'fresh{i}' for i in range(size // 2)]),
+        }
+        for i in range(size // 2):
+            self.ids[f'fresh{i}'] = size + 3 + i
+        self.starred = dict.fromkeys((f'user{i}', f'repo{i % 3}') for i in range(0, size, 10))
+
+    def follower_count(self, login):
+        return (self.ids.get(login, 0) * 7919) % 100000
+
+    def repos(self, login):
+        repos = [{'name': f'repo{i}', 'fork': i == 2} for i in range(3)]
+        if self.ids.get(login, 0) % 3 == 0:
+            repos.append({'name': login, 'fork': False})
+        return repos
+
+
+class MockGitHub:
+    """
+    Local HTTP server imitating the parts of the GitHub REST and GraphQL APIs the bot uses.
+    Supports per-request latency, a primary rate limit with realistic X-RateLimit-* headers,
+    ETag revalidation (304s do not count against the limit) and random 502 injection.
+    With max_concurrency, requests beyond that many in flight get a secondary rate limit
+    403 with Retry-After, like GitHub's abuse detection.
+    Requests are counted per endpoint for requests-per-operation measurements.
+    """
+
+    def __init__(self, size=1000, latency=0.0, rate_limit=1_000_000, failure_rate=0.0, seed=0,
+                 max_concurrency=None):
+        self.graph = MockGraph(size)
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.reset_at = int(time.time()) + 3600
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.not_modified = 0
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.secondary_limited = 0
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                mock.handle(self, 'GET')
+
+            def do_PUT(self):
+                mock.handle(self, 'PUT')
+
+            def do_DELETE(self):
+                mock.handle(self, 'DELETE')
+
+            def do_POST(self):
+                mock.handle(self, 'POST')
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    # Request handling
+
+    def handle(self, handler, method):
+        parsed = urlparse(handler.path)
+        path = parsed.path.strip('/')
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else b''
+
+        if path == '_bench/stats':
+            # Out-of-band counters for the benchmark harness; not counted or rate limited
+            with self.lock:
+                stats = {'requests': sum(self.requests.values()), 'not_modified': self.not_modified,
+                         'secondary_limited': self.secondary_limited, 'by_endpoint': dict(self.requests)}
+            return self.respond(handler, 200, stats, count=False)
+
+        endpoint = self.endpoint_name(method, path)
+        with self.lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.in_flight += 1
+            over_limit = self.max_concurrency is not None and self.in_flight > self.max_concurrency
+            if over_limit:
+                self.secondary_limited += 1
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if over_limit:
+                return self.respond(handler, 403, {'message': 'You have exceeded a secondary rate limit.'},
+                                    {'Retry-After': '1'})
+            return self.serve(handler, method, path, query, body)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def serve(self, handler, method, path, query, body):
+
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            return self.respond(handler, 502, {'message': 'Server Error'})
+        with self.lock:
+            exhausted = self.remaining <= 0 and time.time() < self.reset_at
+        if exhausted:
+            return self.respond(handler, 403, {'message': 'API rate limit exceeded'})
+
+        status, payload, headers = self.route(method, path, query, body)
+
+        etag = None
+        if method == 'GET' and status == 200:
+            etag = '"' + hashlib.md5(json.dumps(payload).encode()).hexdigest() + '"'
+            headers['ETag'] = etag
+            if handler.headers.get('If-None-Match') == etag:
+                with self.lock:
+                    self.not_modified += 1
+                return self.respond(handler, 304, None, headers, count=False)
+        self.respond(handler, status, payload, headers)
+
+    def endpoint_name(self, method, path):
+        name = re.sub(r'(users|repos|following|starred)/[^/]+', r'\1/{x}', path)
+        name = re.sub(r'\{x\}/[^/]+', '{x}/{y}', name)
+        return f'{method} /{name}'
+
+    def respond(self, handler, status, payload, headers=None, count=True):
+        resource = 'graphql' if handler.path.startswith('/graphql') else 'core'
+        with self.lock:
+            if time.time() >= self.reset_at:
+                self.remaining = self.rate_limit
+                self.reset_at = int(time.time()) + 3600
+            if count and self.remaining > 0:
+                self.remaining -= 1
+            rate_headers = {
+                'X-RateLimit-Limit': str(self.rate_limit),
+                'X-RateLimit-Remaining': str(self.remaining),
+                'X-RateLimit-Used': str(self.rate_limit - self.remaining),
+                'X-RateLimit-Reset': str(self.reset_at),
+                'X-RateLimit-Resource': resource,
+            }
+        data = b'' if payload is None or status in (204, 304) else json.dumps(payload).encode()
+        handler.send_response(status)
+        for name, value in {**rate_headers, **(headers or {})}.items():
+            handler.send_header(name, value)
+        if data:
+            handler.send_header('Content-Type', 'application/json; charset=utf-8')
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+        if data:
+            handler.wfile.write(data)
+
+    def paginate(self, path, items, query, transform=None):
+        items = list(items)
+        per_page = min(int(query.get('per_page', 30)), 100)
+        page = int(query.get('page', 1))
+        last = max(1, -(-len(items) // per_page))
+        chunk = items[(page - 1) * per_page:page * per_page]
+        if transform is not None:
+            chunk = [transform(item) for item in chunk]
+        links = []
+        base = f'{self.url}/{path}'
+        if page < last:
+            links.append(f'<{base}?{urlencode({**query, "page": page + 1})}>; rel="next"')
+            links.append(f'<{base}?{urlencode({**query, "page": last})}>; rel="last"')
+        headers = {'Link': ', '.join(links)} if links else {}
+        return 200, chunk, headers
+
+    def user_stub(self, login):
+        # Same fields as a real GitHub list entry, so memory measurements are realistic
+        user_id = self.graph.ids.get(login, 0)
+        url = f'{self.url}/users/{login}'
+        return {'login': login, 'id': user_id, 'node_id': f'MDQ6VXNlcj{user_id:08d}',
+                'avatar_url': f'https://avatars.githubusercontent.com/u/{user_id}?v=4', 'gravatar_id': '',
+                'url': url, 'html_url': f'https://github.com/{login}', 'followers_url': f'{url}/followers',
+                'following_url': f'{url}/following{{/other_user}}', 'gists_url': f'{url}/gists{{/gist_id}}',
+                'starred_url': f'{url}/starred{{/owner}}{{/repo}}', 'subscriptions_url': f'{url}/subscriptions',
+                'organizations_url': f'{url}/orgs', 'repos_url': f'{url}/repos',
+                'events_url': f'{url}/events{{/privacy}}', 'received_events_url': f'{url}/received_events',
+                'type': 'User', 'user_view_type': 'public', 'site_admin': False}
+
+    def route(self, method, path, query, body):
+        graph = self.graph
+        parts = path.split('/')
+        with graph.lock:
+            if path == 'rate_limit':
+                return 200, {'rate': {'limit': self.rate_limit, 'remaining': self.remaining,
+                                      'reset': self.reset_at}}, {}
+            if path == 'graphql' and method == 'POST':
+                return 200, self.graphql(json.loads(body or b'{}')), {}
+            if path == 'user/following' and method == 'GET':
+                return self.paginate(path, graph.following[ME], query, self.user_stub)
+            if len(parts) == 3 and parts[:2] == ['user', 'following']:
+                login = parts[2]
+                if method == 'PUT':
+                    graph.following[ME][login] = None
+                    return 204, None, {}
+                if method == 'DELETE':
+                    graph.following[ME].pop(login, None)
+                    return 204, None, {}
+            if path == 'user/starred' and method == 'GET':
+                return self.paginate(path, graph.starred, query, lambda key: {
+                    'name': key[1], 'full_name': f'{key[0]}/{key[1]}', 'owner': self.user_stub(key[0])})
+            if len(parts) == 4 and parts[:2] == ['user', 'starred']:
+                key = (parts[2], parts[3])
+                if method == 'PUT':
+                    graph.starred[key] = None
+                    return 204, None, {}
+                if method == 'DELETE':
+                    if key in graph.starred:
+                        del graph.starred[key]
+                        return 204, None, {}
+                    return 404, {'message': 'Not Found'}, {}
+            if parts[0] == 'users' and len(parts) >= 2 and method == 'GET':
+                login = parts[1]
+                if login not in graph.ids:
+                    return 404, {'message': 'Not Found'}, {}
+                if len(parts) == 2:
+                    return 200, {**self.user_stub(login), 'followers': graph.follower_count(login)}, {}
+                if parts[2] == 'followers':
+                    return self.paginate(path, graph.followers.get(login, {}), query, self.user_stub)
+                if parts[2] == 'following':
+                    return self.paginate(path, graph.following.get(login, {}), query, self.user_stub)
+                if parts[2] == 'repos':
+                    return self.paginate(path, graph.repos(login), query)
+            if parts[0] == 'repos' and len(parts) == 3 and method == 'GET':
+                names = {repo['name'] for repo in graph.repos(parts[1])}
+                if parts[2] in names:
+                    return 200, {'name': parts[2], 'owner': self.user_stub(parts[1])}, {}
+                return 404, {'message': 'Not Found'}, {}
+        return 404, {'message': 'Not Found'}, {}
+
+    def graphql(self, payload):
+        graph = self.graph
+        query = payload.get('query', '')
+        variables = payload.get('variables') or {}
+        if 'viewer' in query:
+            following = list(graph.following[ME])
+            start = int(variables.get('after') or 0)
+            chunk = following[start:start + 100]
+            end = start + len(chunk)
+            return {'data': {'viewer': {'following': {
+                'totalCount': len(following),
+                'pageInfo': {'hasNextPage': end < len(following), 'endCursor': str(end)},
+                'nodes': [self.graphql_user(login) for login in chunk],
+            }}}}
+        return {'data': None, 'errors': [{'message': 'The mock only answers viewer.following queries.'}]}
+
+    def graphql_user(self, login):
+        return {'login': login, 'databaseId': self.graph.ids.get(login),
+                'followers': {'totalCount': self.graph.follower_count(login)},
+                'isFollowingViewer': login in self.graph.followers.get(ME, {})}
@@ -0,0 +1,203 @@
+# run_benchmarks.py
+"""
+Throughput benchmarks for every menu action against the local mock GitHub API.
+
+    python -m benchmarks.run_benchmarks                      # 1k and 10k users
+    python -m benchmarks.run_benchmarks --sizes 1000,10000,100000 --latency 0.02
+    python -m benchmarks.run_benchmarks --cases sync,top-followed --json results.json
+
+Each case runs in a fresh subprocess (fresh caches, store and memory accounting) against
+a freshly generated mock graph, and reports wall time, requests sent, requests per second,
+requests per user, peak Python memory and peak bytes per user.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+
+from benchmarks.mock_github import ME, TARGET, MockGitHub
+
+CASES = {
+    'sync': "cold sync of following, followers and stars",
+    'sync-warm': "second sync, served by ETag revalidation",
+    'unfollow-nonmutual': "unfollow everyone who does not follow back",
+    'follow': "follow the target's followers without starring",
+    'follow-star': "follow the target's followers and star one repo each",
+    'top-followed': "top 10 by follower count via GraphQL",
+    'top-followed-rest': "top 10 by follower count via REST",
+    'top-followed-rest-warm': "second REST top 10, counts served by the resource cache",
+    'unstar-all': "snapshot and unstar every starred repository",
+    'followers-list': "load the target's followers into memory",
+}
+
+
+def fetch_stats(api_url):
+    with urllib.request.urlopen(f'{api_url}/_bench/stats') as response:
+        return json.load(response)
+
+
+def run_case(case):
+    """
+    Runs one case inside the worker process and returns its measurements.
+    The environment already points the bot at the mock server.
+    """
+    from scripts import cli
+    # Commands import their modules lazily; load them up front so imports are not measured
+    from scripts import follower_manager
+    import scripts.unfollower_manager  # noqa: F401
+    from scripts.logging_config import get_logger, setup_logging
+
+    loaded = []
+
+    def followers_list():
+        # Keeps the list alive until the peak has been read
+        loaded.append(follower_manager.get_followers_of_user(TARGET, get_logger('benchmark')))
+        return 0 if len(loaded[0]) else 1
+
+    commands = {
+        'sync': ['sync'],
+        'sync-warm': ['sync'],
+        'unfollow-nonmutual': ['unfollow-nonmutual'],
+        'follow': ['follow', '--from', TARGET, '--no-star'],
+        'follow-star': ['follow', '--from', TARGET],
+        'top-followed': ['top-followed'],
+        'top-followed-rest': ['top-followed'],
+        'top-followed-rest-warm': ['top-followed'],
+        'unstar-all': ['unstar-all', '--yes'],
+        'followers-list': followers_list,
+    }
+    api_url = os.environ['GITHUB_API_URL']
+    quiet = io.StringIO()
+    with contextlib.redirect_stdout(quiet), contextlib.redirect_stderr(quiet):
+        if case == 'sync-warm':
+            cli.main(['sync'])
+        if case == 'top-followed-rest-warm':
+            cli.main(['top-followed'])
+        command = commands[case]
+        if callable(command):
+            setup_logging()
+        else:
+            command = lambda argv=command: cli.main(argv)  # noqa: E731
+
+        before = fetch_stats(api_url)
+        tracemalloc.start()
+        started = time.perf_counter()
+        exit_code = command()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        after = fetch_stats(api_url)
+
+    if exit_code:
+        # The command's own output was silenced; show why it failed
+        sys.stderr.write(quiet.getvalue()[-2000:])
+    requests_sent = after['requests'] - before['requests']
+    return {
+        'exit_code': exit_code,
+        'seconds': elapsed,
+        'requests': requests_sent,
+        'not_modified': after['not_modified'] - before['not_modified'],
+        'secondary_limited': after['secondary_limited'] - before['secondary_limited'],
+        'peak_memory_mb': peak / 1e6,
+    }
+
+
+def run_in_subprocess(case, size, latency, failure_rate, max_concurrency=None, adaptive=True):
+    mock = MockGitHub(size=size, latency=latency, failure_rate=failure_rate,
+                      max_concurrency=max_concurrency).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            env = dict(os.environ)
+            env.update({
+                'GITHUB_TOKEN': 'benchmark-token',
+                'GITHUB_USERNAME': ME,
+                'GITHUB_API_URL': mock.url,
+                'GITHUB_CACHE_DIR': os.path.join(workdir, 'http'),
+                'GITHUB_GRAPH_DB': os.path.join(workdir, 'graph.db'),
+                'GITHUB_JOBS_DIR': os.path.join(workdir, 'jobs'),
+                'GITHUB_RESOURCE_CACHE_DB': os.path.join(workdir, 'resources.db'),
+                'GITHUB_WRITE_INTERVAL': '0',
+                'GITHUB_ADAPTIVE_CONCURRENCY': '1' if adaptive else '0',
+                'GITHUB_USE_GRAPHQL': '0' if case.startswith('top-followed-rest') else '1',
+            })
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            result = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.run_benchmarks', '--worker', case],
+                cwd=workdir, env={**env, 'PYTHONPATH': root}, capture_output=True, text=True
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"{case} at {size} users failed:\n{result.stderr}")
+            measurement = json.loads(result.stdout.strip().splitlines()[-1])
+            if measurement['exit_code']:
+                print(f"{case} at {size} users exited with {measurement['exit_code']}:\n{result.stderr}",
+                      file=sys.stderr)
+    finally:
+        mock.stop()
+
+    measurement.update({
+        'case': case,
+        'size': size,
+        'requests_per_second': measurement['requests'] / measurement['seconds'] if measurement['seconds'] else 0.0,
+        'requests_per_user': measurement['requests'] / size,
+        'bytes_per_user': measurement['peak_memory_mb'] * 1e6 / size,
+    })
+    return measurement
+
+
+def print_table(results):
+    header = f"{'case':<24} {'users':>7} {'exit':>4} {'seconds':>9} {'requests':>9} {'304s':>7} {'403s':>6} {'req/s':>9} {'req/user':>9} {'peak MB':>8} {'B/user':>7}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{r['case']:<24} {r['size']:>7} {r['exit_code']:>4} {r['seconds']:>9.2f} {r['requests']:>9} {r['not_modified']:>7} {r['secondary_limited']:>6} "
+              f"{r['requests_per_second']:>9.1f} {r['requests_per_user']:>9.3f} {r['peak_memory_mb']:>8.1f} {r['bytes_per_user']:>7.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the bot against a local mock GitHub API.")
+    parser.add_argument('--sizes', default='1000,10000', help="comma-separated graph sizes (default: 1000,10000)")
+    parser.add_argument('--cases', default=','.join(CASES), help="comma-separated cases (default: all)")
+    parser.add_argument('--latency', type=float, default=0.0, help="simulated seconds of latency per request")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="share of requests answered with a 502")
+    parser.add_argument('--max-concurrency', type=int,
+                        help="answer requests beyond this many in flight with a secondary rate limit 403")
+    parser.add_argument('--fixed-concurrency', action='store_true',
+                        help="pin the bot's concurrency at its maximums instead of adapting")
+    parser.add_argument('--json', metavar='PATH', help="also write the results to a JSON file")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_case(args.worker)))
+        return 0
+
+    cases = [case.strip() for case in args.cases.split(',') if case.strip()]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}; choose from {', '.join(CASES)}")
+
+    results = []
+    for size in (int(size) for size in args.sizes.split(',')):
+        for case in cases:
+            print(f"Running {case} ({CASES[case]}) with {size} users...", file=sys.stderr)
+            results.append(run_in_subprocess(case, size, args.latency, args.failure_rate,
+                                             max_concurrency=args.max_concurrency,
+                                             adaptive=not args.fixed_concurrency))
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    # A failed command is not a valid measurement
+    return 1 if any(r['exit_code'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
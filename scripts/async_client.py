@@ -0,0 +1,144 @@
+# async_client.py
+
+import asyncio
+import concurrent.futures
+import functools
+from scripts.concurrency import AdaptiveConcurrency, endpoint_class
+
+
+class _AdaptiveGate:
+    """
+    Async context manager that admits a request while fewer than the controller's
+    current limit for its endpoint class are in flight. Limits may change between requests.
+    """
+
+    def __init__(self, concurrency, kind):
+        self.concurrency = concurrency
+        self.kind = kind
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    def _has_room(self):
+        return self.in_flight < self.concurrency.current(self.kind)
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(self._has_room)
+            self.in_flight += 1
+
+    async def __aexit__(self, *exc):
+        async with self._condition:
+            self.in_flight -= 1
+            room = self.concurrency.current(self.kind) - self.in_flight
+            if room > 0:
+                self._condition.notify(room)
+
+
+class AsyncGitHubClient:
+    """
+    asyncio front end for the shared GitHubClient.
+    Requests (or any blocking helper such as follow_user) run on a worker pool sized to
+    the connection pool, gated by a global semaphore and one adaptive gate per endpoint class,
+    so read-heavy phases can keep many requests in flight while writes stay serialised.
+    The per-class limits come from the client's AdaptiveConcurrency controller, which
+    moves them between 1 and the configured ceilings (self.limits) as GitHub responds.
+    Pacing, caching and retries still happen in the wrapped client.
+    """
+
+    def __init__(self, client, max_in_flight=None, limits=None):
+        self.client = client
+        # More requests in flight than pooled connections would just open throwaway connections
+        self.max_in_flight = max_in_flight or client.pool_maxsize
+        self.concurrency = getattr(client, 'concurrency', None) or AdaptiveConcurrency(limits, adaptive=False)
+        self.limits = self.concurrency.ceilings
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_in_flight, thread_name_prefix='github-io')
+        self._loop = None
+        self._global = None
+        self._semaphores = {}
+
+    def _gates(self, kind):
+        # Semaphores belong to one event loop; recreate them for every asyncio.run()
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._global = asyncio.Semaphore(self.max_in_flight)
+            self._semaphores = {name: _AdaptiveGate(self.concurrency, name) for name in self.limits}
+        return self._global, self._semaphores[kind]
+
+    async def call(self, kind, func, *args, **kwargs):
+        """
+        Runs a blocking GitHub call on the worker pool under the limits of an endpoint class.
+        """
+        global_gate, class_gate = self._gates(kind)
+        async with class_gate, global_gate:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def request(self, method, path, **kwargs):
+        return await self.call(endpoint_class(method, path), self.client.request, method, path, **kwargs)
+
+    async def get(self, path, cache=False, **kwargs):
+        return await self.call('read', self.client.get, path, cache=cache, **kwargs)
+
+    async def put(self, path, **kwargs):
+        return await self.call('write', self.client.put, path, **kwargs)
+
+    async def delete(self, path, **kwargs):
+        return await self.call('write', self.client.delete, path, **kwargs)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+async def iterate_in_thread(iterable):
+    """
+    Async iterator over a blocking iterable (e.g. a paginator), pulling each item
+    in a worker thread so the event loop keeps serving other requests meanwhile.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = iter(iterable)
+    sentinel = object()
+    while True:
+        item = await loop.run_in_executor(None, next, iterator, sentinel)
+        if item is sentinel:
+            break
+        yield item
+
+
+async def for_each(items, worker, limit):
+    """
+    Awaits worker(item) for every item with at most `limit` tasks alive at once,
+    so huge work lists do not turn into one task per item up front.
+    items may be a regular or an async iterable.
+    Exceptions from workers propagate after the running tasks are cancelled.
+    """
+    if not hasattr(items, '__aiter__'):
+        items = _as_async(items)
+    pending = set()
+    try:
+        async for item in items:
+            pending.add(asyncio.ensure_future(worker(item)))
+            if len(pending) >= limit:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+        if pending:
+            done, pending = await asyncio.wait(pending)
+            for task in done:
+                task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _as_async(items):
+    for item in items:
+        yield item
+
+
+def run_sync(coro):
+    """
+    Runs a coroutine to completion from synchronous code (the menu and CLI entry points).
+    """
+    return asyncio.run(coro)
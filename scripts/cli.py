@@ -0,0 +1,317 @@
+# cli.py
+
+import argparse
+import contextlib
+import json
+import sys
+from scripts.config import ConfigError, get_config
+from scripts.jobs import Job, unfinished_jobs
+from scripts.logging_config import get_logger, setup_logging
+from scripts.metrics import get_metrics
+from scripts.resource_cache import cache_summary
+
+logger = get_logger('main')
+
+# Command modules (and requests with them) are imported inside each command,
+# so the menu and commands such as 'jobs' start without loading the network stack.
+
+
+def run_sync(args):
+    """
+    Brings the local graph store up to date with GitHub.
+    Unchanged pages are served from the ETag cache and cost no rate limit quota.
+    """
+    from scripts.github_utils import get_client, get_username
+    from scripts.graph_store import get_store, sync_all
+
+    print("Syncing your following, followers and starred repositories...")
+    results = sync_all(get_store(), get_client(), get_username(), logger)
+    for name, (added, removed) in results.items():
+        print(f"{name.capitalize()}: {added} new, {removed} removed")
+        logger.info(f"Synced {name}: {added} new, {removed} removed")
+    return {name: {'added': added, 'removed': removed} for name, (added, removed) in results.items()}
+
+
+def run_follow(args):
+    """
+    Follows the followers of every account given with --from in one deduplicated run.
+    """
+    from scripts.follower_manager import follow_from_targets
+
+    logger.info(f"Following followers of {', '.join(args.targets)} (starring: {not args.no_star}).")
+    return follow_from_targets(args.targets, should_star=not args.no_star)
+
+
+def run_unfollow_nonmutual(args):
+    from scripts.unfollower_manager import unfollow_script
+
+    return {'unfollowed': unfollow_script()}
+
+
+def run_unstar_all(args):
+    if not args.yes:
+        confirm = input("Are you sure you want to delete (unstar) all your starred repositories? (y/n): ")
+        if confirm.strip().lower() != 'y':
+            print("Operation canceled.")
+            logger.info("User canceled the deletion of starred repositories.")
+            return {'unstarred': 0, 'canceled': True}
+    from scripts.github_utils import unstar_all_repositories
+
+    return {'unstarred': unstar_all_repositories()}
+
+
+def run_top_followed(args):
+    from scripts.follower_manager import search_most_followed_in_following
+
+    return search_most_followed_in_following(top_n=args.n)
+
+
+def run_plan(args):
+    """
+    Dry run: computes what a follow/unfollow/unstar run would do from the local graph store,
+    with its request count and ETA, without sending any follow, unfollow or star request.
+    With --refresh the lists involved are synced first (mostly free 304s).
+    """
+    from scripts.github_utils import get_client, get_username
+    from scripts.graph_store import get_store, sync_followers, sync_following, sync_stars
+    from scripts.planner import (describe, estimate, plan_follow, plan_unfollow, plan_unstar, rate_limit_headroom,
+                                 save_plan)
+
+    store = get_store()
+    client = get_client()
+    your_username = get_username()
+    if args.refresh:
+        if args.kind == 'follow':
+            sync_following(store, client, your_username, logger)
+        if args.kind == 'unfollow-nonmutual':
+            from scripts.unfollower_manager import sync_follow_back_status
+            sync_follow_back_status(store, client, your_username)
+        if args.kind == 'follow':
+            for target in args.targets:
+                sync_followers(store, client, target, logger)
+        if args.kind == 'unstar-all' or (args.kind == 'follow' and not args.no_star):
+            sync_stars(store, client, logger)
+
+    if args.kind == 'follow':
+        plan = plan_follow(store, your_username, args.targets, should_star=not args.no_star)
+    elif args.kind == 'unfollow-nonmutual':
+        plan = plan_unfollow(store, your_username)
+    else:
+        plan = plan_unstar(store, your_username)
+    config = get_config()
+    estimate(plan, rate_limit_headroom(client), write_interval=config.write_interval, reserve=config.rate_reserve)
+
+    print(describe(plan))
+    if any(age is None for age in plan['snapshots'].values()):
+        print("Some lists were never synced; run 'sync' or plan again with --refresh.")
+    if args.save:
+        save_plan(plan, args.save)
+        print(f"Plan saved to {args.save}. Run it with: python main.py run-plan {args.save}")
+    logger.info(f"Planned {plan['kind']}: {len(plan['items'])} actions, {plan['requests']} requests, "
+                f"ETA {plan['estimate']['eta_seconds']}s")
+    return plan
+
+
+def run_saved_plan(args):
+    """
+    Executes a plan saved with 'plan --save' as a resumable job.
+    """
+    from scripts.planner import load_plan
+
+    config = get_config().require_credentials()
+    plan = load_plan(args.path, max_age=None if args.force else config.plan_max_age)
+    if plan['user'] != config.username:
+        raise ValueError(f"Plan {args.path} was made for {plan['user']}, not {config.username}")
+    if not plan['items']:
+        print("The plan has nothing to do.")
+        return {'kind': plan['kind'], 'actions': 0}
+    job = Job.create(plan['kind'], plan['params'], plan['items'])
+    logger.info(f"Running plan {args.path} as job {job.id}.")
+    return run_job(job)
+
+
+def run_job(job):
+    """
+    Resumes one unfinished job and returns its result.
+    """
+    logger.info(f"Resuming job {job.id}: {job.describe()}")
+    if job.kind == 'follow':
+        from scripts.follower_manager import follow_specific_user
+        return follow_specific_user(job=job)
+    if job.kind == 'unfollow':
+        from scripts.unfollower_manager import unfollow_script
+        return {'unfollowed': unfollow_script(job=job)}
+    if job.kind == 'unstar':
+        from scripts.github_utils import unstar_all_repositories
+        return {'unstarred': unstar_all_repositories(job=job)}
+    raise ValueError(f"Unknown job kind: {job.kind}")
+
+
+def run_jobs(args):
+    """
+    Lists unfinished jobs, or resumes/discards them.
+    """
+    jobs = unfinished_jobs()
+    if args.id:
+        jobs = [job for job in jobs if job.id == args.id]
+        if not jobs:
+            raise SystemExit(f"No unfinished job with id {args.id}")
+    if args.resume:
+        return [{'job': job.id, 'result': run_job(job)} for job in jobs]
+    if args.discard:
+        for job in jobs:
+            job.discard()
+            logger.info(f"Discarded job {job.id}.")
+        return [{'job': job.id, 'discarded': True} for job in jobs]
+    for job in jobs:
+        print(f"{job.id}: {job.describe()}")
+    return [{'job': job.id, 'kind': job.kind, 'params': job.params, 'total': job.meta['total'],
+             'done': len(job.succeeded())} for job in jobs]
+
+
+def split_targets(value):
+    targets = [target.strip() for target in value.split(',') if target.strip()]
+    if not targets:
+        raise argparse.ArgumentTypeError("expected a comma-separated list of usernames")
+    return targets
+
+
+def positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {number}")
+    return number
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='main.py',
+        description="GitHub automation bot. Run without arguments for the interactive menu."
+    )
+    parser.add_argument('--json', action='store_true',
+                        help="print the result as JSON on stdout (progress goes to stderr)")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="export per-endpoint request metrics: PATH.prom writes a Prometheus "
+                             "textfile, any other PATH gets JSON lines appended")
+    parser.add_argument('--no-summary', action='store_true',
+                        help="do not print the request summary at the end of the run")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    sync = subparsers.add_parser('sync', help="sync following, followers and stars into the local store")
+    sync.set_defaults(func=run_sync)
+
+    follow = subparsers.add_parser('follow', help="follow the followers of one or more accounts")
+    follow.add_argument('--from', dest='targets', type=split_targets, required=True,
+                        metavar='USER[,USER...]', help="accounts whose followers to follow")
+    follow.add_argument('--no-star', action='store_true', help="do not star a repository per followed user")
+    follow.set_defaults(func=run_follow)
+
+    unfollow = subparsers.add_parser('unfollow-nonmutual', help="unfollow users who don't follow you back")
+    unfollow.set_defaults(func=run_unfollow_nonmutual)
+
+    unstar = subparsers.add_parser('unstar-all', help="unstar every starred repository")
+    unstar.add_argument('-y', '--yes', action='store_true', help="skip the confirmation prompt")
+    unstar.set_defaults(func=run_unstar_all)
+
+    top = subparsers.add_parser('top-followed', help="rank the users you follow by follower count")
+    top.add_argument('-n', type=positive_int, default=10, help="how many users to show (default: 10)")
+    top.set_defaults(func=run_top_followed)
+
+    plan = subparsers.add_parser('plan', help="dry run: show what a command would do and what it would cost")
+    plan.add_argument('--save', metavar='PATH', help="save the plan as JSON to run later with run-plan")
+    plan.add_argument('--refresh', action='store_true', help="sync the lists involved before planning")
+    plan_kinds = plan.add_subparsers(dest='kind', required=True)
+    plan_follow_parser = plan_kinds.add_parser('follow', help="plan following the followers of accounts")
+    plan_follow_parser.add_argument('--from', dest='targets', type=split_targets, required=True,
+                                    metavar='USER[,USER...]', help="accounts whose followers to follow")
+    plan_follow_parser.add_argument('--no-star', action='store_true', help="plan without starring")
+    plan_kinds.add_parser('unfollow-nonmutual', help="plan unfollowing users who don't follow you back")
+    plan_kinds.add_parser('unstar-all', help="plan unstarring every starred repository")
+    plan.set_defaults(func=run_plan)
+
+    run_plan_parser = subparsers.add_parser('run-plan', help="execute a plan saved with 'plan --save'")
+    run_plan_parser.add_argument('path', help="saved plan file")
+    run_plan_parser.add_argument('--force', action='store_true',
+                                 help="run the plan even if it is older than GITHUB_PLAN_MAX_AGE (24h)")
+    run_plan_parser.set_defaults(func=run_saved_plan)
+
+    jobs = subparsers.add_parser('jobs', help="list, resume or discard unfinished jobs")
+    jobs.add_argument('--id', help="only act on this job")
+    action = jobs.add_mutually_exclusive_group()
+    action.add_argument('--resume', action='store_true', help="resume the unfinished job(s)")
+    action.add_argument('--discard', action='store_true', help="delete the unfinished job(s)")
+    jobs.set_defaults(func=run_jobs)
+
+    return parser
+
+
+def report_metrics(args):
+    """
+    Prints and logs the per-endpoint request summary of the command that just ran,
+    and exports it if --metrics (or GITHUB_METRICS_FILE) is set. Lookups answered by
+    the local resource cache are summarized after it.
+    """
+    metrics = get_metrics()
+    summary = metrics.summary()
+    local = cache_summary(reset=True)
+    if local:
+        summary = f"{summary}\nLocal cache:\n{local}" if summary else f"Local cache:\n{local}"
+    if not summary:
+        return
+    logger.info(f"Request summary for {args.command}:\n{summary}")
+    if not args.no_summary:
+        print(f"\nRequest summary:\n{summary}", file=sys.stderr if args.json else sys.stdout)
+    path = args.metrics or get_config().metrics_file
+    if path:
+        try:
+            metrics.export(path, command=args.command)
+        except OSError as e:
+            logger.error(f"Could not write metrics to {path}: {e}")
+
+
+def main(argv=None):
+    """
+    Entry point for non-interactive runs. Returns a process exit code.
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        setup_logging()
+    except ConfigError as e:
+        # A malformed setting fails while loading the config, before logging exists
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    logger.info(f"CLI command: {args.command}")
+    # Each command (including every menu action) gets its own summary and retry budget.
+    # The client only exists once a command has imported github_utils.
+    get_metrics().reset()
+    github_utils = sys.modules.get('scripts.github_utils')
+    if github_utils is not None:
+        github_utils.reset_retry_policy()
+    try:
+        if args.json:
+            # Keep stdout clean for the JSON document
+            with contextlib.redirect_stdout(sys.stderr):
+                result = args.func(args)
+            json.dump(result, sys.stdout, indent=2)
+            sys.stdout.write('\n')
+        else:
+            args.func(args)
+    except ConfigError as e:
+        logger.info(f"Configuration error: {e}")
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        # Network failures (requests' exceptions are OSErrors) are expected: no traceback
+        logger.info(f"Command {args.command} failed: {e}")
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        logger.exception(f"Command {args.command} failed: {e}")
+        print(f"An unexpected error occurred: {e}", file=sys.stderr)
+        return 1
+    finally:
+        report_metrics(args)
+    return 0
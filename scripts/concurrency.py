@@ -0,0 +1,135 @@
+# concurrency.py
+
+import threading
+import time
+from scripts.config import DEFAULT_LIMITS
+from scripts.logging_config import get_logger
+from scripts.rate_limiter import WRITE_METHODS, resource_for
+
+# Outcomes the client reports for every attempt
+OK = 'ok'
+ERROR = 'error'        # 5xx or connection error: stops growth, no cut
+LIMITED = 'limited'    # 403 secondary limit or 429: cut
+
+# Each cut multiplies the limit by this factor
+DECREASE_FACTOR = 0.5
+# A response slower than this multiple of the average latency counts as a spike...
+LATENCY_SPIKE_FACTOR = 3.0
+# ...but only if it also took at least this long, so jitter on fast responses is ignored
+MIN_SPIKE_SECONDS = 0.5
+# Weight of the newest sample in the average latency
+LATENCY_SMOOTHING = 0.1
+# Seconds between log lines with the current limits
+LOG_INTERVAL = 10.0
+
+
+def endpoint_class(method, path):
+    """
+    Classifies a request as 'read', 'write' or 'graphql' for concurrency limiting.
+    """
+    if resource_for(path) == 'graphql':
+        return 'graphql'
+    return 'write' if method.upper() in WRITE_METHODS else 'read'
+
+
+class AIMDLimit:
+    """
+    In-flight limit for one endpoint class, tuned additive-increase/multiplicative-decrease:
+    it grows by one after `limit` healthy responses in a row (about once per round of
+    requests) and halves on a rate limit response or a latency spike. Responses to requests
+    sent before the last cut belong to the same congestion event and do not cut again.
+    """
+
+    def __init__(self, name, maximum, minimum=1, initial=None):
+        self.name = name
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.limit = initial if initial is not None else max(self.minimum, maximum // 2)
+        self.latency = None
+        self.cuts = 0
+        self._healthy = 0
+        self._last_cut = 0.0
+
+    def record(self, seconds, outcome, now):
+        """
+        Feeds one finished attempt. Returns the reason for a cut ('rate limited' or
+        'latency spike'), or None if the limit was not cut.
+        """
+        spike = (outcome == OK and self.latency is not None
+                 and seconds >= max(MIN_SPIKE_SECONDS, self.latency * LATENCY_SPIKE_FACTOR))
+        if outcome == OK:
+            self.latency = seconds if self.latency is None else (
+                LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * self.latency)
+        if outcome == OK and not spike:
+            self._healthy += 1
+            if self._healthy >= self.limit and self.limit < self.maximum:
+                self._healthy = 0
+                self.limit += 1
+            return None
+
+        self._healthy = 0
+        if outcome == ERROR or now - seconds < self._last_cut:
+            return None
+        self._last_cut = now
+        self.limit = max(self.minimum, int(self.limit * DECREASE_FACTOR))
+        self.cuts += 1
+        return 'rate limited' if outcome == LIMITED else 'latency spike'
+
+
+class AdaptiveConcurrency:
+    """
+    Thread-safe set of AIMD limits, one per endpoint class ('read', 'write', 'graphql'),
+    fed by the client with the latency and outcome of every attempt. The configured
+    limits are the ceilings; each class starts at half its ceiling. With
+    adaptive=False every class stays pinned at its ceiling.
+    The limits are logged every LOG_INTERVAL seconds and on every cut.
+    """
+
+    def __init__(self, limits=None, adaptive=True, logger=None):
+        ceilings = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.adaptive = adaptive
+        self.limits = {
+            name: AIMDLimit(name, maximum, initial=None if adaptive else maximum)
+            for name, maximum in ceilings.items()
+        }
+        self.logger = logger or get_logger('concurrency')
+        self._lock = threading.Lock()
+        self._last_log = time.monotonic()
+
+    @property
+    def ceilings(self):
+        return {name: limit.maximum for name, limit in self.limits.items()}
+
+    def current(self, kind):
+        """
+        Returns how many requests of an endpoint class may be in flight right now.
+        """
+        return self.limits[kind].limit
+
+    def record(self, method, url, seconds, outcome):
+        """
+        Feeds one finished attempt (OK, ERROR or LIMITED) into its class's limit.
+        """
+        if not self.adaptive:
+            return
+        kind = endpoint_class(method, url)
+        now = time.monotonic()
+        with self._lock:
+            limit = self.limits[kind]
+            cut = limit.record(seconds, outcome, now)
+            log_state = now - self._last_log >= LOG_INTERVAL
+            if log_state:
+                self._last_log = now
+        if cut:
+            self.logger.info(f"Concurrency for {kind} requests cut to {limit.limit} ({cut}).")
+        if log_state:
+            self.logger.info(f"Concurrency limits: {self.describe()}")
+
+    def describe(self):
+        """
+        Formats the current limits, e.g. "read=12/32 write=1/2 graphql=4/4 (1 cut)".
+        """
+        with self._lock:
+            parts = [f"{name}={limit.limit}/{limit.maximum}" for name, limit in self.limits.items()]
+            cuts = sum(limit.cuts for limit in self.limits.values())
+        return ' '.join(parts) + (f" ({cuts} cut{'s' if cuts != 1 else ''})" if cuts else '')
@@ -0,0 +1,202 @@
+# config.py
+
+import os
+import threading
+
+# Built-in defaults of every setting. The modules using them import them from here, so a
+# client, governor or cache built without a Config gets the same values as one built from it.
+API_URL = 'https://api.github.com'
+# Connection pool and per-request timeout (seconds)
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 32
+DEFAULT_TIMEOUT = 15.0
+# Requests kept in reserve per bucket so other tools using the same token are not starved
+DEFAULT_RESERVE = 50
+# Minimum spacing between write requests (follow/star/unstar) to stay under the secondary limit
+# GitHub allows roughly 80 content-generating requests per minute
+DEFAULT_WRITE_INTERVAL = 0.8
+DEFAULT_MAX_ATTEMPTS = 5
+# Total retries allowed in one run before failures are returned as-is
+DEFAULT_RETRY_BUDGET = 500
+# Per endpoint class concurrency ceilings. Writes stay low because the governor spaces them out anyway.
+DEFAULT_LIMITS = {'read': 32, 'write': 2, 'graphql': 4}
+# Kinds of cached resources and how long each stays fresh (seconds)
+DEFAULT_TTLS = {
+    'profile': 6 * 3600,      # follower counts from /users/{login}
+    'repos': 3600,            # a user's own repository listing
+    'repo_exists': 24 * 3600,  # whether owner/name exists (the username/username README repo)
+}
+DEFAULT_MAX_ENTRIES = 50000
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'http')
+DEFAULT_GRAPH_DB = os.path.join('.cache', 'graph.db')
+DEFAULT_JOBS_DIR = os.path.join('.cache', 'jobs')
+DEFAULT_RESOURCE_CACHE_DB = os.path.join('.cache', 'resources.db')
+
+
+class ConfigError(Exception):
+    """
+    Raised when a required setting (the token or username) is missing or a setting is malformed.
+    """
+
+
+def _int(environ, name, default):
+    value = environ.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ConfigError(f"{name} must be a whole number, got {value!r}.") from None
+
+
+def _float(environ, name, default):
+    value = environ.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ConfigError(f"{name} must be a number, got {value!r}.") from None
+
+
+class Config:
+    """
+    Every setting of the bot in one place. Built from the environment (after the .env
+    file is loaded) by load_config(); nothing reads os.environ at import time, so a .env
+    value always wins over the built-in default.
+    """
+
+    def __init__(self, token=None, username=None, api_url=API_URL,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 timeout=DEFAULT_TIMEOUT, rate_reserve=DEFAULT_RESERVE, write_interval=DEFAULT_WRITE_INTERVAL,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, retry_budget=DEFAULT_RETRY_BUDGET,
+                 cache_dir=DEFAULT_CACHE_DIR, graph_db=DEFAULT_GRAPH_DB, jobs_dir=DEFAULT_JOBS_DIR,
+                 use_graphql=True, read_concurrency=DEFAULT_LIMITS['read'],
+                 write_concurrency=DEFAULT_LIMITS['write'], graphql_concurrency=DEFAULT_LIMITS['graphql'],
+                 repo_cache_ttl=DEFAULT_TTLS['repos'], metrics_file='', log_dir='logs',
+                 log_max_bytes=5 * 1024 * 1024, log_backup_count=5, plan_max_age=24 * 3600,
+                 resource_cache_db=DEFAULT_RESOURCE_CACHE_DB, resource_cache_size=DEFAULT_MAX_ENTRIES,
+                 profile_cache_ttl=DEFAULT_TTLS['profile'], repo_exists_ttl=DEFAULT_TTLS['repo_exists'],
+                 adaptive_concurrency=True):
+        self.token = token
+        self.username = username
+        self.api_url = api_url
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.rate_reserve = rate_reserve
+        self.write_interval = write_interval
+        self.max_attempts = max_attempts
+        self.retry_budget = retry_budget
+        self.cache_dir = cache_dir
+        self.graph_db = graph_db
+        self.jobs_dir = jobs_dir
+        self.use_graphql = use_graphql
+        self.read_concurrency = read_concurrency
+        self.write_concurrency = write_concurrency
+        self.graphql_concurrency = graphql_concurrency
+        self.repo_cache_ttl = repo_cache_ttl
+        self.metrics_file = metrics_file
+        self.log_dir = log_dir
+        self.log_max_bytes = log_max_bytes
+        self.log_backup_count = log_backup_count
+        self.plan_max_age = plan_max_age
+        self.resource_cache_db = resource_cache_db
+        self.resource_cache_size = resource_cache_size
+        self.profile_cache_ttl = profile_cache_ttl
+        self.repo_exists_ttl = repo_exists_ttl
+        self.adaptive_concurrency = adaptive_concurrency
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """
+        Reads every GITHUB_* setting from `environ` (os.environ by default).
+        Unset or empty variables keep their defaults.
+        """
+        env = os.environ if environ is None else environ
+        defaults = cls()
+        return cls(
+            token=env.get('GITHUB_TOKEN') or None,
+            username=env.get('GITHUB_USERNAME') or None,
+            api_url=env.get('GITHUB_API_URL') or defaults.api_url,
+            pool_connections=_int(env, 'GITHUB_POOL_CONNECTIONS', defaults.pool_connections),
+            pool_maxsize=_int(env, 'GITHUB_POOL_MAXSIZE', defaults.pool_maxsize),
+            timeout=_float(env, 'GITHUB_TIMEOUT', defaults.timeout),
+            rate_reserve=_int(env, 'GITHUB_RATE_RESERVE', defaults.rate_reserve),
+            write_interval=_float(env, 'GITHUB_WRITE_INTERVAL', defaults.write_interval),
+            max_attempts=_int(env, 'GITHUB_MAX_ATTEMPTS', defaults.max_attempts),
+            retry_budget=_int(env, 'GITHUB_RETRY_BUDGET', defaults.retry_budget),
+            cache_dir=env.get('GITHUB_CACHE_DIR') or defaults.cache_dir,
+            graph_db=env.get('GITHUB_GRAPH_DB') or defaults.graph_db,
+            jobs_dir=env.get('GITHUB_JOBS_DIR') or defaults.jobs_dir,
+            use_graphql=env.get('GITHUB_USE_GRAPHQL', '1') != '0',
+            read_concurrency=_int(env, 'GITHUB_READ_CONCURRENCY', defaults.read_concurrency),
+            write_concurrency=_int(env, 'GITHUB_WRITE_CONCURRENCY', defaults.write_concurrency),
+            graphql_concurrency=_int(env, 'GITHUB_GRAPHQL_CONCURRENCY', defaults.graphql_concurrency),
+            repo_cache_ttl=_int(env, 'GITHUB_REPO_CACHE_TTL', defaults.repo_cache_ttl),
+            metrics_file=env.get('GITHUB_METRICS_FILE') or defaults.metrics_file,
+            log_dir=env.get('GITHUB_LOG_DIR') or defaults.log_dir,
+            log_max_bytes=_int(env, 'GITHUB_LOG_MAX_BYTES', defaults.log_max_bytes),
+            log_backup_count=_int(env, 'GITHUB_LOG_BACKUP_COUNT', defaults.log_backup_count),
+            plan_max_age=_int(env, 'GITHUB_PLAN_MAX_AGE', defaults.plan_max_age),
+            # An empty value keeps the resource cache in memory only
+            resource_cache_db=env.get('GITHUB_RESOURCE_CACHE_DB', defaults.resource_cache_db),
+            resource_cache_size=_int(env, 'GITHUB_RESOURCE_CACHE_SIZE', defaults.resource_cache_size),
+            profile_cache_ttl=_int(env, 'GITHUB_PROFILE_CACHE_TTL', defaults.profile_cache_ttl),
+            repo_exists_ttl=_int(env, 'GITHUB_REPO_EXISTS_TTL', defaults.repo_exists_ttl),
+            adaptive_concurrency=env.get('GITHUB_ADAPTIVE_CONCURRENCY', '1') != '0',
+        )
+
+    @property
+    def concurrency_limits(self):
+        return {'read': self.read_concurrency, 'write': self.write_concurrency,
+                'graphql': self.graphql_concurrency}
+
+    def require_credentials(self):
+        """
+        Raises ConfigError unless both the token and the username are set.
+        """
+        if not self.token or not self.username:
+            raise ConfigError('GITHUB_TOKEN and GITHUB_USERNAME must be set in the .env file.')
+        return self
+
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def load_config(dotenv=True):
+    """
+    Loads the .env file (without overriding variables already set) and builds the
+    shared Config from the environment. Called once, on first use.
+    """
+    global _config
+    with _config_lock:
+        if dotenv:
+            try:
+                from dotenv import load_dotenv
+            except ImportError:
+                pass
+            else:
+                load_dotenv()
+        _config = Config.from_env()
+        return _config
+
+
+def get_config():
+    """
+    Returns the shared Config, loading it on first use.
+    """
+    if _config is None:
+        return load_config()
+    return _config
+
+
+def set_config(config):
+    """
+    Replaces the shared Config (e.g. with an explicit one in scripts or benchmarks).
+    Clients built from the previous config are not rebuilt.
+    """
+    global _config
+    with _config_lock:
+        _config = config
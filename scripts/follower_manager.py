@@ -1,205 +1,335 @@
 # follower_manager.py
-import concurrent.futures
-import time
+import heapq
 import requests  # type: ignore
-from scripts.github_utils import follow_user, star_user_random_repo, headers
-import logging
-import os
+from scripts.config import get_config
+from scripts.github_utils import (follow_user, get_async_client, get_client, get_username, resolve_repo_to_star,
+                                  star_repository)
+from scripts.async_client import for_each, iterate_in_thread, run_sync
+from scripts.graph_store import get_store, sync_following, sync_stars
+from scripts.jobs import Job
+from scripts.pagination import fetch_users, iter_pages
+from scripts.graphql import GraphQLError, iter_following_follower_counts
+from scripts.logging_config import get_logger
+from scripts.pipeline import Pipeline, Stage
+from scripts.planner import CandidateFilter
+from scripts.progress import progress_bar
+from scripts.resource_cache import get_resource_cache
+from scripts.users import UserList, project_users
 
-log_directory = "logs"
-if not os.path.exists(log_directory):
-    os.makedirs(log_directory)
+logger = get_logger('follower_manager')
 
-def setup_logging():
+
+def get_followers_of_user(username, logger):
     """
-    Sets up logging for follower_manager.py.
-    Logs are stored in the 'logs' directory with the filename 'follower_manager.log'.
+    Retrieves followers of the specified user as a compact UserList (logins and ids), with logging.
+    Raises requests.exceptions.RequestException if a page cannot be fetched.
     """
-    logger = logging.getLogger('follower_manager')
-    logger.setLevel(logging.INFO)
+    return fetch_users(get_client(), f'users/{username}/followers', logger, f'followers of {username}')
 
-    # Prevent adding multiple handlers if already set
-    if not logger.handlers:
-        fh = logging.FileHandler(os.path.join(log_directory, 'follower_manager.log'), mode='w')
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        fh.setFormatter(formatter)
-        logger.addHandler(fh)
-        logger.propagate = False
-
-    return logger
+def follow_specific_user(should_star=True, job=None, target_username=None):
+    """
+    Follow users from a specific GitHub account, optionally starring a repository each.
+    The target is asked for on stdin unless given; pass an unfinished job to resume it.
+    Returns a summary dict with the followed, starred and skipped counts.
+    """
+    if job is not None:
+        logger.info(f"Resuming job {job.id}: {job.describe()}")
+        summary = {'target': job.params['target'], 'followed': 0, 'starred': 0, 'skipped': 0, 'overlapping': 0}
+        return run_follow_job(job, summary)
 
-logger = setup_logging()
+    if target_username is None:
+        target_username = input("Enter the username whose followers you want to follow: ").strip()
+    return follow_from_targets([target_username], should_star=should_star)
 
+def follow_from_targets(targets, should_star=True):
+    """
+    Follows the followers of several accounts in one deduplicated run.
+    Returns a summary dict that also counts candidates shared between targets.
+    """
+    store = get_store()
+    client = get_client()
+    your_username = get_username()
+    summary = {'target': ','.join(targets), 'followed': 0, 'starred': 0, 'skipped': 0, 'overlapping': 0}
+    logger.info(f"User initiated following followers of: {summary['target']}")
 
-def get_rate_limit(logger):
-    """Fetch the current rate limit status from GitHub API with logging."""
     try:
-        response = requests.get("https://api.github.com/rate_limit", headers=headers)
-        response.raise_for_status()  # Raise exception for non-200 responses
-        data = response.json()
-        remaining = data['rate']['remaining']
-        reset_time = data['rate']['reset']
-        logger.info(f"Rate limit remaining: {remaining}, reset at {reset_time}")
-        return remaining, reset_time
+        # Cheap when nothing changed: unchanged pages come back as 304s
+        sync_following(store, client, your_username, logger)
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching rate limit: {str(e)}")
-        return None, None
+        logger.error(f"Error syncing your following list: {str(e)}")
+        print("Could not refresh your following list; using the last synced list if any.")
+    if should_star:
+        try:
+            # Lets the starring step skip repositories you have already starred
+            sync_stars(store, client, logger)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error syncing your starred repositories: {str(e)}")
 
-def get_followers_of_user(username, logger):
+    # Candidates are added to the job as the pipeline finds them
+    job = Job.create('follow', {'target': summary['target'], 'should_star': should_star}, [], open_queue=True)
+    return run_follow_job(job, summary)
+
+def run_follow_job(job, summary):
     """
-    Retrieves followers of the specified user, with logging.
+    Follows (and optionally stars for) every user of a follow job, journaling each one,
+    through the pipeline pages -> filter -> follow -> resolve star -> star.
+    Fills in and returns the summary dict.
     """
-    followers = []
-    page = 1
-    while True:
-        followers_url = f'https://api.github.com/users/{username}/followers?page={page}'
+    store = get_store()
+    client = get_client()
+    async_client = get_async_client()
+    your_username = get_username()
+    should_star = job.params['should_star']
+    targets = job.params['target'].split(',')
+    write_workers = async_client.limits['write']
+    counts = {'followed': 0, 'starred': 0}
+
+    def finish(username, status):
+        job.mark_done(username, status)
+        pbar.set_postfix_str(f"followed: {counts['followed']}"
+                             + (f", starred: {counts['starred']}" if should_star else ''), refresh=False)
+        pbar.update(1)
+
+    async def fetch_pages(target, emit):
+        users = UserList()
+        path = f'users/{target}/followers'
         try:
-            response = requests.get(followers_url, headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            data = response.json()
-            if not data:
-                logger.info(f"No more followers found for {username}")
-                break
-            followers.extend(data)
-            logger.info(f"Fetched {len(data)} followers on page {page} for {username}")
-            page += 1
+            async for page, data in iterate_in_thread(iter_pages(client, path, project=project_users)):
+                logger.info(f"Fetched {len(data)} followers of {target} on page {page}")
+                users.extend(data)
+                for username in data:
+                    await emit((target, username))
         except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching followers of {username}: {str(e)}")
-            break
-    return followers
-
-def follow_specific_user(should_star=True):
-    """
-    Follow users from a specific GitHub account by their username.
-    Optionally star their repositories.
-    """
-    logger = logging.getLogger('follower_manager')
-    target_username = input("Enter the username whose followers you want to follow: ").strip()
-    logger.info(f"User initiated following followers of: {target_username}")
-    followers = get_followers_of_user(target_username, logger)
-
-    if not followers:
-        logger.info(f"No followers found for {target_username}")
-        return
-
-    followed_count = 0
-    starred_count = 0
-
-    for user in followers:
-        username = user['login']
-        logger.info(f"Attempting to follow {username}...")
-        if follow_user(username):
-            followed_count += 1
-            logger.info(f"Successfully followed {username}")
-            if should_star:
-                if star_user_random_repo(username):
-                    starred_count += 1
-                    logger.info(f"Successfully starred a repository for {username}")
-                else:
-                    logger.error(f"Failed to star a repository for {username}")
-        else:
+            logger.error(f"Error fetching followers of {target}: {str(e)}")
+            print(f"Could not fetch followers of {target}; using the last synced list if any.")
+            for username in store.followers(target):
+                await emit((target, username))
+            return
+        store.replace_edges(target, 'followers', users)
+
+    following = set()
+    candidate_filter = CandidateFilter(your_username, following)
+    queued = set()
+    done = set()
+
+    async def filter_candidates(item, emit):
+        target, username = item
+        if not candidate_filter.check(target, username):
+            return
+        if username in done:
+            return
+        if username not in queued:
+            job.add_item(username)
+        await emit(username)
+
+    async def follow(username, emit):
+        followed = await async_client.call('write', follow_user, username)
+        store.record_action('follow', username, followed)
+        if not followed:
             logger.error(f"Failed to follow {username}")
-        time.sleep(1)  # Delay to avoid rate limits
+            finish(username, 'failed')
+            return
+        store.add_edge(your_username, username)
+        counts['followed'] += 1
+        logger.info(f"Followed {username}")
+        if should_star:
+            await emit(username)
+        else:
+            finish(username, 'ok')
+
+    async def resolve_star(username, emit):
+        repo_name = await async_client.call('read', resolve_repo_to_star, username)
+        if repo_name is None:
+            # No repositories, all already starred, or the listing failed (logged by the lookup)
+            logger.info(f"No repository to star for {username}")
+            finish(username, 'ok')
+            return
+        await emit((username, repo_name))
 
+    async def star(item, emit):
+        username, repo_name = item
+        if await async_client.call('write', star_repository, username, repo_name):
+            counts['starred'] += 1
+        else:
+            logger.info(f"Could not star {username}/{repo_name}")
+        finish(username, 'ok')
+
+    stages = [Stage('follow', follow, workers=write_workers)]
+    if should_star:
+        stages += [Stage('resolve star', resolve_star, workers=max(1, async_client.limits['read'] // 4)),
+                   Stage('star', star, workers=write_workers)]
+    if job.queue_closed:
+        # Every candidate is already queued: skip 'pages' and 'filter'
+        source = job.pending()
+        total = len(source)
+        print(f"{total} of {job.meta['total']} followers of {job.params['target']} left to process.")
+    else:
+        following.update(store.following(your_username))
+        queued.update(job.items())
+        done.update(job.succeeded())
+        stages = [Stage('pages', fetch_pages, workers=min(len(targets), 4), queue_size=len(targets)),
+                  Stage('filter', filter_candidates, queue_size=1000)] + stages
+        source = targets
+        total = None
+        print(f"Following followers of {job.params['target']} as their lists are fetched...")
+
+    pipeline = Pipeline(stages, logger=logger)
+    with progress_bar("Following", total=total) as pbar:
+        run_sync(pipeline.run(source))
+    report = pipeline.report()
+    logger.info(f"Follow pipeline:\n{report}")
+    print(f"\nPipeline stages:\n{report}\n")
+    if not job.queue_closed:
+        job.close_queue()
+        summary['skipped'] = candidate_filter.counts['already_followed']
+        summary['overlapping'] = candidate_filter.counts['overlapping']
+        logger.info(f"Skipped {summary['skipped']} followers of {summary['target']} (already followed or yourself) "
+                    f"and {summary['overlapping']} duplicates across targets.")
+        print(f"Skipped {summary['skipped']} followers you already follow.")
+        if len(targets) > 1:
+            print(f"Skipped {summary['overlapping']} followers shared between targets.")
+    if not job.meta['total']:
+        logger.info(f"No followers to follow for {summary['target']}")
+        job.discard()
+        return summary
+    if not job.finish():
+        print(f"{len(job.pending())} users could not be followed; resume the job to retry them "
+              f"(python main.py jobs --resume).")
+
+    followed_count = counts['followed']
+    starred_count = counts['starred']
     logger.info(f"Total users followed: {followed_count}")
     if should_star:
         logger.info(f"Total repositories starred: {starred_count}")
     print(f"Total users followed: {followed_count}")
     if should_star:
         print(f"Total repositories starred: {starred_count}")
+    summary.update(followed=followed_count, starred=starred_count)
+    return summary
 
-def search_most_followed_in_following():
+def iter_follower_counts_graphql(on_total=None):
     """
-    Searches for users in your following list with the most followers.
-    Displays the top 10 users sorted by their follower count with a progress bar.
+    Streams (username, follower_count) for everyone you follow through GraphQL,
+    reading 100 users and their counts per query. The counts are also stored in the
+    resource cache for later REST lookups.
     """
-    try:
-        # Fetch the list of users you are following
-        remaining, reset_time = get_rate_limit(logger)
-        if remaining == 0:
-            sleep_time = reset_time - time.time() + 10  # Adding a buffer to ensure rate limit is reset
-            if sleep_time > 0:
-                logger.info(f"Rate limit reached. Sleeping for {sleep_time} seconds...")
-                print(f"Rate limit reached. Sleeping for {sleep_time} seconds...")
-                time.sleep(sleep_time)
-
-        following = []
-        page = 1
-        per_page = 100  # Max per page for GitHub API
-        while True:
-            following_url = f'https://api.github.com/users/{os.getenv("GITHUB_USERNAME")}/following?page={page}&per_page={per_page}'
-            response = requests.get(following_url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            if not data:
-                break
-            following.extend(data)
-            logger.info(f"Fetched {len(data)} users from following list on page {page}")
-            page += 1
-        if not following:
-            print("You are not following anyone.")
-            logger.info("No users found in your following list.")
+    cache = get_resource_cache()
+    for username, follower_count in iter_following_follower_counts(get_client(), on_total=on_total):
+        logger.info(f"Fetched {username} with {follower_count} followers.")
+        cache.put('profile', username, {'followers': follower_count})
+        yield username, follower_count
+
+async def follower_counts_rest(on_result):
+    """
+    Streams (username, follower_count) for everyone you follow into on_result, with one
+    GET /users/{login} per user not fresh in the resource cache.
+    """
+    client = get_client()
+    async_client = get_async_client()
+    your_username = get_username()
+    cache = get_resource_cache()
+
+    async def fetch_follower_count(username):
+        profile = cache.get('profile', username)
+        if profile is not None:
+            on_result(username, profile['followers'])
             return
-        
-        total_users = len(following)
-        user_followers = []
-        fetched_followers = 0
-        
-        print(f"Fetching follower counts for {total_users} users you are following...")
-        
-        # Initialize tqdm progress bar
+        user_url = f'users/{username}'
         try:
-            from tqdm import tqdm
-        except ImportError:
-            print("tqdm module not found. Please install it using 'pip install tqdm'.")
-            return
-        
-        def fetch_follower_count(user):
-            nonlocal remaining, reset_time
-            if remaining == 0:
-                sleep_time = reset_time - time.time() + 10  # Adding a buffer to ensure rate limit is reset
-                if sleep_time > 0:
-                    logger.info(f"Rate limit reached. Sleeping for {sleep_time} seconds...")
-                    print(f"Rate limit reached. Sleeping for {sleep_time} seconds...")
-                    time.sleep(sleep_time)
-                remaining, reset_time = get_rate_limit(logger)
-
-            username = user['login']
-            user_url = f'https://api.github.com/users/{username}'
-            try:
-                user_response = requests.get(user_url, headers=headers)
-                user_response.raise_for_status()
-                user_data = user_response.json()
-                follower_count = user_data.get('followers', 0)
-                logger.info(f"Fetched {username} with {follower_count} followers.")
-                remaining -= 1
-                return username, follower_count
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Failed to fetch data for {username}. Error: {str(e)}")
-                return username, 0
-        
-        # Use ThreadPoolExecutor to fetch follower counts concurrently
-        with tqdm(total=total_users, desc="Processing Users", unit="user") as pbar:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-                future_to_user = {executor.submit(fetch_follower_count, user): user for user in following}
-                for future in concurrent.futures.as_completed(future_to_user):
-                    username, follower_count = future.result()
-                    user_followers.append((username, follower_count))
-                    fetched_followers += follower_count
-                    pbar.update(1)  # Update the progress bar
-        
-        # Sort users by follower count in descending order
-        user_followers.sort(key=lambda x: x[1], reverse=True)
-        # Display top 10 users
-        top_n = 10
-        print(f"\nTop {top_n} users you are following by follower count:")
-        print("=" * 50)
-        for i, (username, followers) in enumerate(user_followers[:top_n], start=1):
-            print(f"{i}. {username} - {followers} followers")
-        logger.info(f"Displayed top {top_n} users you are following by follower count.")
-        print(f"\nTotal followers fetched: {fetched_followers}")
-        logger.info(f"Total followers fetched: {fetched_followers}")
+            user_response = await async_client.get(user_url)
+            user_response.raise_for_status()
+            user_data = user_response.json()
+            follower_count = user_data.get('followers', 0)
+            cache.put('profile', username, {'followers': follower_count})
+            logger.info(f"Fetched {username} with {follower_count} followers.")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to fetch data for {username}. Error: {str(e)}")
+            follower_count = 0
+        on_result(username, follower_count)
+
+    def following_logins():
+        for page, data in iter_pages(client, f'users/{your_username}/following', project=project_users):
+            logger.info(f"Fetched {len(data)} users from following list on page {page}")
+            yield from data
+
+    limit = async_client.limits['read']
+    await for_each(iterate_in_thread(following_logins()), fetch_follower_count, limit=limit)
+
+def push_top_n(heap, top_n, username, follower_count):
+    """
+    Keeps the top_n (follower_count, username) pairs seen so far in a min-heap.
+    """
+    if len(heap) < top_n:
+        heapq.heappush(heap, (follower_count, username))
+    elif follower_count > heap[0][0]:
+        heapq.heapreplace(heap, (follower_count, username))
+
+def print_leaderboard(heap, top_n):
+    """
+    Prints the current top users, highest follower count first.
+    """
+    print(f"\nTop {top_n} users you are following by follower count:")
+    print("=" * 50)
+    for i, (followers, username) in enumerate(sorted(heap, reverse=True), start=1):
+        print(f"{i}. {username} - {followers} followers")
+
+def search_most_followed_in_following(top_n=10):
+    """
+    Displays the top N users you follow by follower count and returns them as a list of
+    {'login', 'followers'} dicts, highest first. Raises requests.exceptions.RequestException
+    if the following list cannot be read, after showing the leaderboard so far.
+    """
+    heap = []
+    processed = 0
+    fetched_followers = 0
+
+    def record(username, follower_count):
+        nonlocal processed, fetched_followers
+        push_top_n(heap, top_n, username, follower_count)
+        processed += 1
+        fetched_followers += follower_count
+        leader_count, leader = max(heap)
+        pbar.set_postfix_str(f"leader: {leader} ({leader_count})", refresh=False)
+        pbar.update(1)  # Update the progress bar
+
+    # Pacing against the rate limit is handled by the client's governor
+    try:
+        with progress_bar("Processing Users") as pbar:
+            def set_total(total):
+                pbar.total = total
+                pbar.refresh()
+
+            done = False
+            if get_config().use_graphql:
+                try:
+                    for username, follower_count in iter_follower_counts_graphql(on_total=set_total):
+                        record(username, follower_count)
+                    done = True
+                except (requests.exceptions.RequestException, GraphQLError) as e:
+                    logger.warning(f"GraphQL follower lookup failed, falling back to REST: {str(e)}")
+                    print("GraphQL lookup failed, falling back to REST API...")
+                    heap.clear()
+                    processed = fetched_followers = 0
+                    pbar.reset()
+            if not done:
+                run_sync(follower_counts_rest(record))
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching following list or user data: {str(e)}")
-        print(f"An error occurred: {str(e)}")
+        if heap:
+            print("Showing partial results.")
+            print_leaderboard(heap, top_n)
+        raise
+    except KeyboardInterrupt:
+        logger.warning(f"Search interrupted after {processed} users.")
+        print(f"\nInterrupted after {processed} users. Showing partial results.")
+
+    if not processed:
+        print("You are not following anyone.")
+        logger.info("No users found in your following list.")
+        return []
 
+    print_leaderboard(heap, top_n)
+    logger.info(f"Displayed top {top_n} users you are following by follower count.")
+    print(f"\nTotal followers fetched: {fetched_followers}")
+    logger.info(f"Total followers fetched: {fetched_followers}")
+    return [{'login': username, 'followers': followers} for followers, username in sorted(heap, reverse=True)]
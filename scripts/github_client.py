@@ -0,0 +1,170 @@
+# github_client.py
+
+import time
+import requests  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+from scripts.concurrency import ERROR, LIMITED, OK
+from scripts.config import API_URL, DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE, DEFAULT_TIMEOUT
+from scripts.rate_limiter import RateLimitGovernor
+from scripts.http_cache import HTTPCache
+from scripts.logging_config import get_logger
+from scripts.metrics import Metrics, endpoint_label
+from scripts.retry import (AUTH, MAX_CIRCUIT_WAITS, RATE_LIMITED, RETRYABLE, RETRYABLE_EXCEPTIONS,
+                           CircuitOpenError, RetryPolicy, classify, endpoint_key)
+
+logger = get_logger('github_client')
+
+# How many times a rate limited request is re-sent after the governor's pause
+MAX_RATE_LIMIT_RETRIES = 3
+
+
+class GitHubClient:
+    """
+    Shared GitHub API client.
+    Wraps a pooled requests.Session so every call reuses warm keep-alive
+    connections instead of opening a new TCP+TLS handshake per request.
+    If given, `concurrency` (an AdaptiveConcurrency) is told the latency and outcome
+    of every attempt, so the async client's in-flight limits follow GitHub's answers.
+    """
+
+    def __init__(self, token, base_url=API_URL, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, timeout=DEFAULT_TIMEOUT, rate_limiter=None,
+                 http_cache=None, retry_policy=None, metrics=None, concurrency=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.rate_limiter = rate_limiter or RateLimitGovernor()
+        self.http_cache = http_cache or HTTPCache()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.metrics = metrics or Metrics()
+        self.concurrency = concurrency
+        self.headers = {
+            'Authorization': f'token {token}',
+            'Accept': 'application/vnd.github.v3+json'
+        }
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def url(self, path):
+        """
+        Builds an absolute API URL. Absolute URLs (e.g. from Link headers) are returned unchanged.
+        """
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, **kwargs):
+        """
+        Sends a request through the pooled session with the default timeout.
+        Every request is paced by the rate limit governor. Rate limited responses are re-sent
+        after the governor's pause; connection errors and 5xx responses are retried with
+        jittered backoff under the retry policy, and requests to an endpoint whose circuit
+        is open wait out its cooldown. 4xx responses are returned as-is.
+        Every attempt is recorded in self.metrics under its endpoint label.
+        Raises requests.exceptions.RequestException once retries are exhausted.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        url = self.url(path)
+        key = endpoint_key(method, url)
+        label = endpoint_label(method, url)
+        attempt = 0
+        rate_limited_attempts = 0
+        circuit_waits = 0
+        while True:
+            open_for = self.retry_policy.open_for(key)
+            if open_for > 0:
+                # Back off from a failing endpoint instead of hammering it
+                circuit_waits += 1
+                if circuit_waits > MAX_CIRCUIT_WAITS:
+                    raise CircuitOpenError(f"Circuit open for {key} after repeated failures")
+                logger.warning(f"Circuit open for {key}; waiting {open_for:.0f}s.")
+                time.sleep(open_for)
+            self.metrics.record_wait(label, self.rate_limiter.acquire(method, url))
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except RETRYABLE_EXCEPTIONS as e:
+                elapsed = time.perf_counter() - started
+                self.metrics.observe(label, e.__class__.__name__, elapsed)
+                self._report(method, url, elapsed, ERROR)
+                self.retry_policy.record_failure(key)
+                attempt += 1
+                if not self.retry_policy.should_retry(attempt):
+                    raise
+                self.metrics.record_retry(label)
+                logger.warning(f"{method} {url} failed ({e.__class__.__name__}); retry {attempt}.")
+                time.sleep(self.retry_policy.delay(attempt))
+                continue
+
+            elapsed = time.perf_counter() - started
+            self.metrics.observe(label, response.status_code, elapsed, len(response.content))
+
+            kind = classify(response, self.rate_limiter.update(response))
+            self._report(method, url, elapsed,
+                         LIMITED if kind == RATE_LIMITED else ERROR if kind == RETRYABLE else OK)
+            if kind == RATE_LIMITED:
+                # The governor already blocks until GitHub allows traffic again
+                rate_limited_attempts += 1
+                if rate_limited_attempts <= MAX_RATE_LIMIT_RETRIES:
+                    self.metrics.record_retry(label)
+                    continue
+                return response
+            if kind == RETRYABLE:
+                self.retry_policy.record_failure(key)
+                attempt += 1
+                if self.retry_policy.should_retry(attempt):
+                    self.metrics.record_retry(label)
+                    logger.warning(f"{method} {url} returned {response.status_code}; retry {attempt}.")
+                    time.sleep(self.retry_policy.delay(attempt))
+                    continue
+                return response
+            if kind == AUTH and response.status_code == 401:
+                logger.error("GitHub rejected the token (401). Check GITHUB_TOKEN in your .env file.")
+            self.retry_policy.record_success(key)
+            return response
+
+    def _report(self, method, url, seconds, outcome):
+        if self.concurrency is not None:
+            self.concurrency.record(method, url, seconds, outcome)
+
+    def get(self, path, cache=False, **kwargs):
+        """
+        Sends a GET request. With cache=True the page is revalidated against the
+        on-disk ETag cache and a 304 is answered from the cached body.
+        """
+        if not cache:
+            return self.request('GET', path, **kwargs)
+
+        url = self.url(path)
+        entry = self.http_cache.load(url)
+        if entry is not None:
+            headers = dict(kwargs.pop('headers', None) or {})
+            headers.update(self.http_cache.conditional_headers(entry))
+            kwargs['headers'] = headers
+
+        response = self.request('GET', url, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.metrics.record_cache(endpoint_label('GET', url), hit=True)
+            return self.http_cache.rebuild(entry, response)
+
+        self.metrics.record_cache(endpoint_label('GET', url), hit=False)
+        self.http_cache.store(url, response)
+        return response
+
+    def put(self, path, **kwargs):
+        # GitHub expects Content-Length: 0 on body-less PUTs (follow, star)
+        kwargs.setdefault('data', b'')
+        return self.request('PUT', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def close(self):
+        self.session.close()
@@ -1,153 +1,292 @@
 # github_utils.py
 
-import requests  # type: ignore
 import random
-import os
-from dotenv import load_dotenv
-import time  # Added for delays
+import threading
+import requests  # type: ignore
+from scripts.config import get_config
+from scripts.github_client import GitHubClient
+from scripts.async_client import AsyncGitHubClient, for_each, run_sync
+from scripts.concurrency import AdaptiveConcurrency
+from scripts.graph_store import get_store, sync_stars
+from scripts.http_cache import HTTPCache
+from scripts.jobs import Job
+from scripts.logging_config import get_logger
+from scripts.metrics import get_metrics
+from scripts.progress import progress_bar
+from scripts.rate_limiter import RateLimitGovernor
+from scripts.resource_cache import get_resource_cache
+from scripts.retry import RetryPolicy
+
+logger = get_logger('github_utils')
 
-# Load environment variables from .env file
-load_dotenv()
+# Built on first use, so importing this module never touches the network or the .env file
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
 
-TOKEN = os.getenv('GITHUB_TOKEN')
-YOUR_USERNAME = os.getenv('GITHUB_USERNAME')
+# Repository listings ask for at most this many repositories
+REPOS_PER_LISTING = 100
+
+def get_client():
+    """
+    Returns the single pooled client shared by every module, building it from the
+    config on first use. Raises ConfigError if the token or username is missing.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            config = get_config().require_credentials()
+            _client = GitHubClient(
+                config.token, base_url=config.api_url, pool_connections=config.pool_connections,
+                pool_maxsize=config.pool_maxsize, timeout=config.timeout,
+                rate_limiter=RateLimitGovernor(reserve=config.rate_reserve, write_interval=config.write_interval),
+                http_cache=HTTPCache(config.cache_dir),
+                retry_policy=RetryPolicy(max_attempts=config.max_attempts, budget=config.retry_budget),
+                metrics=get_metrics(),
+                concurrency=AdaptiveConcurrency(config.concurrency_limits, adaptive=config.adaptive_concurrency),
+            )
+        return _client
 
-# Check if TOKEN and YOUR_USERNAME are set
-if not TOKEN or not YOUR_USERNAME:
-    print('Error: GITHUB_TOKEN and GITHUB_USERNAME must be set in the .env file.')
-    exit(1)
+def reset_retry_policy():
+    """
+    Gives the shared client a fresh retry budget and closed circuits, so one command
+    does not inherit the failures of the previous one. No-op before the client is built.
+    """
+    if _client is not None:
+        _client.retry_policy.reset()
+
+def get_async_client():
+    """
+    Returns the asyncio front end over the shared client, for concurrent phases.
+    """
+    global _async_client
+    client = get_client()
+    with _client_lock:
+        if _async_client is None:
+            _async_client = AsyncGitHubClient(client, limits=get_config().concurrency_limits)
+        return _async_client
 
-headers = {
-    'Authorization': f'token {TOKEN}',
-    'Accept': 'application/vnd.github.v3+json'
-}
+def get_username():
+    """
+    Returns the authenticated user's login from the config.
+    """
+    return get_config().require_credentials().username
 
 def follow_user(username):
     """
     Follows the specified user.
     """
-    follow_url = f'https://api.github.com/user/following/{username}'
-    follow_response = requests.put(follow_url, headers=headers)
+    follow_url = f'user/following/{username}'
+    try:
+        follow_response = get_client().put(follow_url)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error following {username}: {e}")
+        return False
     return follow_response.status_code == 204
 
 def unfollow_user(username):
     """
     Unfollows the specified user.
     """
-    unfollow_url = f'https://api.github.com/user/following/{username}'
-    unfollow_response = requests.delete(unfollow_url, headers=headers)
+    unfollow_url = f'user/following/{username}'
+    try:
+        unfollow_response = get_client().delete(unfollow_url)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error unfollowing {username}: {e}")
+        return False
     return unfollow_response.status_code == 204
 
 def star_repository(owner, repo_name):
     """
     Stars the specified repository. Logs error details if the request fails.
     """
-    star_url = f'https://api.github.com/user/starred/{owner}/{repo_name}'
-    star_response = requests.put(star_url, headers=headers)
+    star_url = f'user/starred/{owner}/{repo_name}'
+    try:
+        star_response = get_client().put(star_url)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to star {owner}/{repo_name}: {e}")
+        get_store().record_action('star', f'{owner}/{repo_name}', False)
+        return False
+    get_store().record_action('star', f'{owner}/{repo_name}', star_response.status_code == 204)
 
     if star_response.status_code == 204:
-        print(f"Successfully starred {owner}/{repo_name}")
+        get_store().add_star(owner, repo_name)
+        logger.info(f"Starred {owner}/{repo_name}")
         return True
-    else:
-        print(f"Failed to star {owner}/{repo_name}. Status code: {star_response.status_code}")
-        try:
-            print(f"Error message: {star_response.json()}")
-        except Exception as e:
-            print(f"Error parsing the response: {e}")
+    logger.error(f"Failed to star {owner}/{repo_name}. Status code: {star_response.status_code}, "
+                 f"response: {star_response.text[:200]}")
+    return False
+
+def get_user_repos(username):
+    """
+    Returns the user's own public repositories (up to 100, most recently pushed first).
+    Listings are kept in the resource cache for GITHUB_REPO_CACHE_TTL seconds (across runs).
+    Returns None if the listing cannot be fetched.
+    """
+    cache = get_resource_cache()
+    repos = cache.get('repos', username)
+    if repos is not None:
+        return repos
+
+    repos_url = f'users/{username}/repos?type=owner&sort=pushed&per_page={REPOS_PER_LISTING}'
+    try:
+        response = get_client().get(repos_url)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to fetch repositories for {username}: {e}")
+        return None
+    if response.status_code != 200:
+        logger.error(f"Failed to fetch repositories for {username}. Status code: {response.status_code}")
+        return None
+    repos = [{'name': repo['name'], 'fork': repo.get('fork', False)} for repo in response.json()]
+    cache.put('repos', username, repos)
+    if len(repos) < REPOS_PER_LISTING:
+        # A complete listing also answers whether the README repository exists
+        readme = any(repo['name'].lower() == username.lower() for repo in repos)
+        cache.put('repo_exists', f'{username}/{username}', readme)
+    return repos
+
+def repo_exists(owner, repo_name):
+    """
+    Returns whether owner/repo_name exists, caching the answer for GITHUB_REPO_EXISTS_TTL
+    seconds. Returns None if GitHub could not be asked.
+    """
+    cache = get_resource_cache()
+    key = f'{owner}/{repo_name}'
+    exists = cache.get('repo_exists', key)
+    if exists is not None:
+        return exists
+    try:
+        response = get_client().get(f'repos/{owner}/{repo_name}')
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to look up {key}: {e}")
+        return None
+    if response.status_code not in (200, 404):
+        logger.error(f"Failed to look up {key}. Status code: {response.status_code}")
+        return None
+    exists = response.status_code == 200
+    cache.put('repo_exists', key, exists)
+    return exists
+
+def choose_repo_to_star(username, repos):
+    """
+    Picks the user's README repository (username/username) if they have one, otherwise a
+    random repository, preferring non-forks and skipping starred ones. Returns None if none is left.
+    """
+    store = get_store()
+    candidates = [repo for repo in repos if not store.is_starred(username, repo['name'])]
+    for repo in candidates:
+        if repo['name'].lower() == username.lower():
+            return repo['name']
+    # A full listing may not include the README repository; look it up (cached) separately
+    if (len(repos) >= REPOS_PER_LISTING and not store.is_starred(username, username)
+            and not any(repo['name'].lower() == username.lower() for repo in repos)
+            and repo_exists(username, username)):
+        return username
+    if not candidates:
+        return None
+    originals = [repo for repo in candidates if not repo['fork']]
+    return random.choice(originals or candidates)['name']
+
+def resolve_repo_to_star(username):
+    """
+    Finds the repository to star for a user (see choose_repo_to_star) without starring it.
+    Costs one (cacheable) repository listing. Returns None if there is nothing to star.
+    """
+    repos = get_user_repos(username)
+    if repos is None:
+        return None
+    if not repos:
+        logger.info(f"{username} has no repositories to star.")
+        return None
+
+    repo_name = choose_repo_to_star(username, repos)
+    if repo_name is None:
+        logger.info(f"All of {username}'s repositories are already starred.")
+    return repo_name
+
+def unstar_repository(full_name):
+    """
+    Unstars one repository ("owner/name"). Transient failures are retried by the client.
+    A 404 means it is already gone and counts as done.
+    """
+    owner, repo_name = full_name.split('/', 1)
+    unstar_url = f'user/starred/{owner}/{repo_name}'
+    try:
+        unstar_response = get_client().delete(unstar_url)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to unstar {full_name}: {e}")
+        get_store().record_action('unstar', full_name, False)
         return False
 
-def star_user_readme_repo(username):
-    """
-    Tries to star the user's README repository (which displays their GitHub bio).
-    The repository is typically named after their username (username/username).
-    """
-    repo_name = username  # GitHub README repo is usually username/username
-    print(f"Attempting to star {username}'s README repository: {repo_name}...")
-
-    # Check if the username/username repo exists
-    repos_url = f'https://api.github.com/repos/{username}/{repo_name}'
-    response = requests.get(repos_url, headers=headers)
-
-    if response.status_code == 200:
-        # Try to star the README repository
-        if star_repository(username, repo_name):
-            print(f"Successfully starred {username}/{repo_name}")
-        else:
-            print(f"Failed to star {username}/{repo_name}")
-    elif response.status_code == 404:
-        print(f"{username} does not have a README repository.")
-    else:
-        print(f"Failed to check repository {repo_name}. Status code: {response.status_code}")
-
-def star_user_random_repo(username):
-    """
-    Attempts to find and star the user's GitHub README repository or a random repository.
-    """
-    # First try to star the README repository
-    star_user_readme_repo(username)
-
-    # If the README repo doesn't exist or fails, star a random repo
-    repos_url = f'https://api.github.com/users/{username}/repos'
-    response = requests.get(repos_url, headers=headers)
-
-    if response.status_code == 200:
-        repos = response.json()
-        if repos:
-            random_repo = random.choice(repos)
-            print(f"Starring random repository: {random_repo['name']} from {username}...")
-            if star_repository(username, random_repo['name']):
-                print(f"Successfully starred {username}/{random_repo['name']}")
-            else:
-                print(f"Failed to star {username}/{random_repo['name']}")
-        else:
-            print(f"{username} has no repositories to star.")
-    else:
-        print(f"Failed to fetch repositories for {username}")
-
-def unstar_all_repositories():
-    """
-    Unstars all repositories that the authenticated user has starred.
-    """
-    unstar_count = 0
-    page = 1
-    per_page = 100  # Maximum allowed per_page for GitHub API
-
-    while True:
-        starred_url = f'https://api.github.com/user/starred?page={page}&per_page={per_page}'
-        response = requests.get(starred_url, headers=headers)
-
-        if response.status_code != 200:
-            print(f"Failed to fetch starred repositories. Status code: {response.status_code}")
-            try:
-                print(f"Error message: {response.json()}")
-            except Exception as e:
-                print(f"Error parsing the response: {e}")
-            break
-
-        starred_repos = response.json()
-
-        if not starred_repos:
-            break
-
-        for repo in starred_repos:
-            owner = repo['owner']['login']
-            repo_name = repo['name']
-            unstar_url = f'https://api.github.com/user/starred/{owner}/{repo_name}'
-            unstar_response = requests.delete(unstar_url, headers=headers)
-
-            if unstar_response.status_code == 204:
-                unstar_count += 1
-                print(f"Unstarred {owner}/{repo_name}")
-            else:
-                print(f"Failed to unstar {owner}/{repo_name}. Status code: {unstar_response.status_code}")
-                try:
-                    print(f"Error message: {unstar_response.json()}")
-                except Exception as e:
-                    print(f"Error parsing the response: {e}")
-
-            time.sleep(0.5)  # Add a small delay to avoid hitting rate limits
-
-        page += 1
+    success = unstar_response.status_code in (204, 404)
+    get_store().record_action('unstar', full_name, success)
+    if success:
+        get_store().remove_star(owner, repo_name)
+        logger.info(f"Unstarred {full_name}")
+        return True
+    logger.error(f"Failed to unstar {full_name}. Status code: {unstar_response.status_code}, "
+                 f"response: {unstar_response.text[:200]}")
+    return False
+
+def unstar_all_repositories(job=None):
+    """
+    Unstars all repositories that the authenticated user has starred; pass an unfinished
+    job to resume it. Raises requests.exceptions.RequestException if your stars cannot be listed.
+    """
+    store = get_store()
+    client = get_client()
+    async_client = get_async_client()
+    if job is None:
+        # Snapshot the whole list first, so unstarring cannot shift pages still being read
+        try:
+            sync_stars(store, client, logger)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to fetch starred repositories: {e}")
+            raise
+        repos = sorted(f'{owner}/{repo_name}' for owner, repo_name in store.starred())
+        if not repos:
+            print("You have no starred repositories.")
+            return 0
+        job = Job.create('unstar', {'user': get_username()}, repos)
+    pending = job.pending()
+    print(f"Unstarring {len(pending)} of {job.meta['total']} repositories...")
+
+    unstarred = set()
+
+    async def unstar(full_name):
+        if await async_client.call('write', unstar_repository, full_name):
+            unstarred.add(full_name)
+        job.mark_done(full_name, 'ok' if full_name in unstarred else 'failed')
+        pbar.update(1)
+
+    with progress_bar("Unstarring", total=len(pending), unit='repo') as pbar:
+        run_sync(for_each(pending, unstar, limit=async_client.limits['write']))
+
+    # Verification pass: anything from the job that GitHub still lists gets one more try
+    try:
+        sync_stars(store, client, logger)
+        queued = set(job.items())
+        leftovers = sorted(name for name in (f'{o}/{r}' for o, r in store.starred()) if name in queued)
+        verified = True
+    except requests.exceptions.RequestException as e:
+        print(f"Could not verify starred repositories: {e}")
+        leftovers = []
+        verified = False
+    if leftovers:
+        print(f"{len(leftovers)} repositories are still starred; retrying them...")
+        retried = {name for name in leftovers if unstar_repository(name)}
+        unstarred |= retried
+        leftovers = [name for name in leftovers if name not in retried]
+    if verified:
+        # Failed unstars that GitHub no longer lists are done after all
+        for name in set(job.pending()) - set(leftovers):
+            job.mark_done(name, 'ok')
+    if not job.finish():
+        print(f"{len(job.pending())} repositories could not be unstarred; resume the job to retry them "
+              f"(python main.py jobs --resume).")
+    unstar_count = len(unstarred)
 
+    if leftovers:
+        print(f"Could not unstar {len(leftovers)} repositories: {', '.join(leftovers[:10])}")
     print(f"Total repositories unstarred: {unstar_count}")
     return unstar_count
@@ -0,0 +1,280 @@
+# graph_store.py
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from scripts.config import DEFAULT_GRAPH_DB, get_config
+from scripts.graphql import iter_following_mutual
+from scripts.pagination import iter_pages
+from scripts.users import UserList, project_users
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    login TEXT PRIMARY KEY,
+    id INTEGER,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS edges (
+    follower TEXT NOT NULL,
+    followee TEXT NOT NULL,
+    PRIMARY KEY (follower, followee)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS edges_by_followee ON edges (followee, follower);
+CREATE TABLE IF NOT EXISTS stars (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    PRIMARY KEY (owner, repo)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS actions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    action TEXT NOT NULL,
+    target TEXT NOT NULL,
+    success INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    name TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+
+class GraphStore:
+    """
+    Persistent local copy of the social graph in SQLite (WAL mode).
+    Holds users, follow edges, starred repositories, an action history and the
+    time each list was last synced, so menu actions can run as indexed queries
+    instead of full API sweeps.
+    """
+
+    def __init__(self, path=DEFAULT_GRAPH_DB):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def _upsert_users(self, users):
+        now = time.time()
+        self.conn.executemany(
+            'INSERT INTO users (login, id, updated_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(login) DO UPDATE SET id = excluded.id, updated_at = excluded.updated_at',
+            [(login, user_id, now) for login, user_id in users.records()]
+        )
+
+    def _record_snapshot(self, name, size):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO snapshots (name, synced_at, size) VALUES (?, ?, ?)',
+            (name, time.time(), size)
+        )
+
+    def replace_edges(self, login, direction, users):
+        """
+        Replaces the stored following ('following') or followers ('followers') list of a
+        user with a fresh listing (a UserList). Only the difference is written.
+        Returns (added, removed) counts.
+        """
+        logins = users.login_set()
+        with self._lock, self.conn:
+            existing = self.following(login) if direction == 'following' else self.followers(login)
+            added = logins - existing
+            removed = existing - logins
+            if direction == 'following':
+                pairs_added = [(login, other) for other in added]
+                pairs_removed = [(login, other) for other in removed]
+            else:
+                pairs_added = [(other, login) for other in added]
+                pairs_removed = [(other, login) for other in removed]
+            self.conn.executemany('INSERT OR IGNORE INTO edges (follower, followee) VALUES (?, ?)', pairs_added)
+            self.conn.executemany('DELETE FROM edges WHERE follower = ? AND followee = ?', pairs_removed)
+            self._upsert_users(users)
+            self._record_snapshot(f'{direction}:{login}', len(logins))
+        return len(added), len(removed)
+
+    def replace_mutuals(self, login, follows_back):
+        """
+        Records for each user `login` follows whether they follow back ({other: bool}),
+        without touching the rest of login's followers list.
+        """
+        with self._lock, self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO edges (follower, followee) VALUES (?, ?)',
+                                  [(other, login) for other, mutual in follows_back.items() if mutual])
+            self.conn.executemany('DELETE FROM edges WHERE follower = ? AND followee = ?',
+                                  [(other, login) for other, mutual in follows_back.items() if not mutual])
+            self._record_snapshot(f'mutual:{login}', len(follows_back))
+
+    def following(self, login):
+        """
+        Returns the set of logins the user follows.
+        Logins are interned, so sets loaded from several lists share their strings.
+        """
+        rows = self.conn.execute('SELECT followee FROM edges WHERE follower = ?', (login,))
+        return {sys.intern(row[0]) for row in rows}
+
+    def followers(self, login):
+        """
+        Returns the set of logins following the user.
+        """
+        rows = self.conn.execute('SELECT follower FROM edges WHERE followee = ?', (login,))
+        return {sys.intern(row[0]) for row in rows}
+
+    def iter_followers(self, login):
+        """
+        Yields the logins following the user, in a stable order, without loading them all.
+        """
+        cursor = self.conn.execute('SELECT follower FROM edges WHERE followee = ? ORDER BY follower', (login,))
+        for row in cursor:
+            yield sys.intern(row[0])
+
+    def add_edge(self, follower, followee):
+        with self._lock, self.conn:
+            self.conn.execute('INSERT OR IGNORE INTO edges (follower, followee) VALUES (?, ?)', (follower, followee))
+
+    def remove_edge(self, follower, followee):
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM edges WHERE follower = ? AND followee = ?', (follower, followee))
+
+    def replace_stars(self, repos):
+        """
+        Replaces the stored starred repositories with a fresh listing.
+        Returns (added, removed) counts.
+        """
+        fresh = {(repo['owner']['login'], repo['name']) for repo in repos}
+        with self._lock, self.conn:
+            existing = self.starred()
+            self.conn.executemany('INSERT OR IGNORE INTO stars (owner, repo) VALUES (?, ?)', fresh - existing)
+            self.conn.executemany('DELETE FROM stars WHERE owner = ? AND repo = ?', existing - fresh)
+            self._record_snapshot('starred', len(fresh))
+        return len(fresh - existing), len(existing - fresh)
+
+    def starred(self):
+        """
+        Returns the set of (owner, repo) pairs currently starred.
+        """
+        return {(row[0], row[1]) for row in self.conn.execute('SELECT owner, repo FROM stars')}
+
+    def is_starred(self, owner, repo):
+        row = self.conn.execute('SELECT 1 FROM stars WHERE owner = ? AND repo = ?', (owner, repo)).fetchone()
+        return row is not None
+
+    def add_star(self, owner, repo):
+        with self._lock, self.conn:
+            self.conn.execute('INSERT OR IGNORE INTO stars (owner, repo) VALUES (?, ?)', (owner, repo))
+
+    def remove_star(self, owner, repo):
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM stars WHERE owner = ? AND repo = ?', (owner, repo))
+
+    def record_action(self, action, target, success):
+        """
+        Appends a follow/unfollow/star/unstar attempt to the action history.
+        """
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT INTO actions (ts, action, target, success) VALUES (?, ?, ?, ?)',
+                (time.time(), action, target, int(bool(success)))
+            )
+
+    def snapshot_age(self, name):
+        """
+        Returns how many seconds ago a list was last synced, or None if never.
+        """
+        row = self.conn.execute('SELECT synced_at FROM snapshots WHERE name = ?', (name,)).fetchone()
+        return None if row is None else time.time() - row[0]
+
+    def close(self):
+        self.conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Returns the shared GraphStore, opening the database on first use.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = GraphStore(get_config().graph_db)
+        return _store
+
+
+def _sync_list(store, client, path, login, direction, logger, description):
+    users = UserList()
+    # Pages are cut down to login and id in the fetch workers, before they queue up
+    for page, data in iter_pages(client, path, project=project_users):
+        users.extend(data)
+        logger.info(f"Fetched {len(data)} {description} on page {page}")
+    added, removed = store.replace_edges(login, direction, users)
+    logger.info(f"Synced {description}: {len(users)} total, {added} new, {removed} gone.")
+    return added, removed
+
+
+def sync_following(store, client, login, logger):
+    """
+    Brings the stored following list of the authenticated user up to date.
+    Unchanged pages are revalidated through the ETag cache and cost no quota.
+    Raises requests.exceptions.RequestException if a page cannot be fetched,
+    leaving the previous snapshot untouched.
+    """
+    return _sync_list(store, client, 'user/following', login, 'following', logger, 'users from following list')
+
+
+def sync_following_mutual(store, client, login, logger):
+    """
+    Syncs the authenticated user's following list through GraphQL, together with whether
+    each of them follows back. Costs |following| / 100 queries regardless of follower count.
+    Raises requests.exceptions.RequestException or GraphQLError on failure, leaving the
+    previous snapshot untouched.
+    """
+    users = UserList()
+    follows_back = {}
+    for other, user_id, mutual in iter_following_mutual(client):
+        users.append(other, user_id)
+        follows_back[users[-1]] = mutual
+    added, removed = store.replace_edges(login, 'following', users)
+    store.replace_mutuals(login, follows_back)
+    logger.info(f"Synced following list with follow-back status via GraphQL: {len(users)} total, "
+                f"{sum(follows_back.values())} follow back, {added} new, {removed} gone.")
+    return added, removed
+
+
+def sync_followers(store, client, login, logger):
+    """
+    Brings the stored followers list of any user up to date.
+    """
+    return _sync_list(store, client, f'users/{login}/followers', login, 'followers', logger, f'followers of {login}')
+
+
+def sync_stars(store, client, logger):
+    """
+    Brings the stored starred repositories of the authenticated user up to date.
+    """
+    repos = []
+    for page, data in iter_pages(client, 'user/starred'):
+        repos.extend({'owner': {'login': repo['owner']['login']}, 'name': repo['name']} for repo in data)
+        logger.info(f"Fetched {len(data)} starred repositories on page {page}")
+    added, removed = store.replace_stars(repos)
+    logger.info(f"Synced starred repositories: {len(repos)} total, {added} new, {removed} gone.")
+    return added, removed
+
+
+def sync_all(store, client, login, logger):
+    """
+    Syncs your following, followers and starred repositories.
+    Returns a dict of (added, removed) counts per list.
+    """
+    return {
+        'following': sync_following(store, client, login, logger),
+        'followers': sync_followers(store, client, login, logger),
+        'starred': sync_stars(store, client, logger),
+    }
@@ -0,0 +1,86 @@
+# graphql.py
+
+# One query pages through 100 followed users at a time; set GITHUB_USE_GRAPHQL=0 to force the REST path
+
+FOLLOWING_COUNTS_QUERY = """
+query($after: String) {
+  viewer {
+    following(first: 100, after: $after) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes { login followers { totalCount } }
+    }
+  }
+}
+"""
+
+FOLLOWING_MUTUAL_QUERY = """
+query($after: String) {
+  viewer {
+    following(first: 100, after: $after) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes { login databaseId isFollowingViewer }
+    }
+  }
+}
+"""
+
+
+class GraphQLError(Exception):
+    """
+    Raised when the GraphQL API answers with an errors payload.
+    """
+
+
+def graphql_query(client, query, variables=None):
+    """
+    Runs a GraphQL v4 query through the shared client and returns its data payload.
+    Raises requests.exceptions.RequestException on HTTP errors and GraphQLError on query errors.
+    """
+    response = client.post('graphql', json={'query': query, 'variables': variables or {}})
+    response.raise_for_status()
+    payload = response.json()
+    if payload.get('errors'):
+        messages = '; '.join(error.get('message', str(error)) for error in payload['errors'])
+        raise GraphQLError(messages)
+    return payload['data']
+
+
+def iter_following_follower_counts(client, on_total=None):
+    """
+    Yields (login, follower_count) for every user the authenticated user follows,
+    reading the counts inline while paging viewer.following 100 users per query.
+    on_total is called once with the size of the following list.
+    """
+    after = None
+    while True:
+        data = graphql_query(client, FOLLOWING_COUNTS_QUERY, {'after': after})
+        following = data['viewer']['following']
+        if on_total is not None and after is None:
+            on_total(following['totalCount'])
+        for node in following['nodes']:
+            yield node['login'], node['followers']['totalCount']
+        if not following['pageInfo']['hasNextPage']:
+            break
+        after = following['pageInfo']['endCursor']
+
+
+def iter_following_mutual(client, on_total=None):
+    """
+    Yields (login, id, follows_back) for every user the authenticated user follows,
+    reading isFollowingViewer inline, so finding non-mutuals costs one query per 100
+    users you follow no matter how many followers you have.
+    """
+    after = None
+    while True:
+        data = graphql_query(client, FOLLOWING_MUTUAL_QUERY, {'after': after})
+        following = data['viewer']['following']
+        if on_total is not None and after is None:
+            on_total(following['totalCount'])
+        for node in following['nodes']:
+            yield node['login'], node.get('databaseId'), node['isFollowingViewer']
+        if not following['pageInfo']['hasNextPage']:
+            break
+        after = following['pageInfo']['endCursor']
+
@@ -0,0 +1,94 @@
+# http_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import requests  # type: ignore
+from requests.structures import CaseInsensitiveDict  # type: ignore
+from scripts.config import DEFAULT_CACHE_DIR
+
+# Response headers worth keeping with a cached body (pagination and content type)
+STORED_HEADERS = ('Content-Type', 'Link', 'ETag', 'Last-Modified')
+
+
+class HTTPCache:
+    """
+    Persistent ETag/Last-Modified cache for GET requests, keyed by URL.
+    Cached pages are revalidated with If-None-Match/If-Modified-Since; GitHub answers
+    unchanged pages with a 304 that does not count against the rate limit.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], f'{key}.json')
+
+    def load(self, url):
+        """
+        Returns the cached entry for a URL, or None.
+        """
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, url, response):
+        """
+        Saves a 200 response that carries a validator. Writes are atomic so concurrent
+        page fetches never leave a half-written entry behind.
+        """
+        if response.status_code != 200:
+            return
+        if 'ETag' not in response.headers and 'Last-Modified' not in response.headers:
+            return
+        self._write({
+            'url': url,
+            'headers': {h: response.headers[h] for h in STORED_HEADERS if h in response.headers},
+            'body': response.text,
+        })
+
+    def _write(self, entry):
+        path = self._path(entry['url'])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def conditional_headers(self, entry):
+        """
+        Builds the revalidation headers for a cached entry.
+        """
+        headers = {}
+        if 'ETag' in entry['headers']:
+            headers['If-None-Match'] = entry['headers']['ETag']
+        if 'Last-Modified' in entry['headers']:
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        return headers
+
+    def rebuild(self, entry, not_modified):
+        """
+        Turns a cached entry back into a 200 response, carrying over the fresh headers
+        from the 304 that revalidated it. The ETag only covers the body, so the Link
+        header (the list may have grown a page) is taken from the 304 too when sent.
+        """
+        fresh = {h: not_modified.headers[h] for h in STORED_HEADERS if h in not_modified.headers}
+        if any(entry['headers'].get(h) != value for h, value in fresh.items()):
+            entry['headers'].update(fresh)
+            self._write(entry)
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry['url']
+        response.encoding = 'utf-8'
+        response._content = entry['body'].encode('utf-8')
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        for name, value in not_modified.headers.items():
+            if name.lower().startswith('x-ratelimit'):
+                response.headers[name] = value
+        # Lets the paginator treat a full cached page without rel="next" as unconfirmed
+        response.from_cache = True
+        return response
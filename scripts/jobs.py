@@ -0,0 +1,202 @@
+# jobs.py
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from scripts.config import get_config
+
+
+class Job:
+    """
+    A persisted bulk operation (follow, unfollow, unstar).
+    The work queue is written when the job is created and every completed item is
+    appended to a journal, so an interrupted job can resume with only the remaining work.
+    A job created with open_queue=True starts empty and has items appended while they are
+    discovered (add_item) until close_queue(); resuming a job whose queue is still open
+    has to discover the rest again.
+
+    Layout of a job directory:
+        job.json     kind, parameters, creation time, queue size, queue_closed and finished flags
+        queue.txt    one item per line, in processing order
+        journal.log  one "status<TAB>item" line per completed item
+    """
+
+    def __init__(self, directory, meta):
+        self.directory = directory
+        self.meta = meta
+        self._lock = threading.Lock()
+        self._journal = None
+        self._queue = None
+
+    @property
+    def id(self):
+        return self.meta['id']
+
+    @property
+    def kind(self):
+        return self.meta['kind']
+
+    @property
+    def params(self):
+        return self.meta['params']
+
+    @property
+    def queue_closed(self):
+        # Jobs written before open queues existed always had their full queue
+        return self.meta.get('queue_closed', True)
+
+    @classmethod
+    def create(cls, kind, params, items, jobs_dir=None, open_queue=False):
+        """
+        Writes a new job with its work queue to disk, under the configured jobs
+        directory unless jobs_dir is given. With open_queue, more items may be
+        added later with add_item().
+        """
+        jobs_dir = jobs_dir or get_config().jobs_dir
+        job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{kind}-{uuid.uuid4().hex[:6]}"
+        directory = os.path.join(jobs_dir, job_id)
+        os.makedirs(directory)
+        items = list(items)
+        with open(os.path.join(directory, 'queue.txt'), 'w', encoding='utf-8') as f:
+            f.writelines(f'{item}\n' for item in items)
+        meta = {'id': job_id, 'kind': kind, 'params': params, 'created': time.time(),
+                'total': len(items), 'queue_closed': not open_queue, 'finished': False}
+        job = cls(directory, meta)
+        job._write_meta()
+        return job
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, 'job.json'), 'r', encoding='utf-8') as f:
+            return cls(directory, json.load(f))
+
+    def _write_meta(self):
+        tmp_path = os.path.join(self.directory, 'job.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, os.path.join(self.directory, 'job.json'))
+
+    def items(self):
+        with open(os.path.join(self.directory, 'queue.txt'), 'r', encoding='utf-8') as f:
+            return [line.rstrip('\n') for line in f if line.strip()]
+
+    def completed(self):
+        """
+        Returns {item: status} for every item already in the journal.
+        """
+        done = {}
+        path = os.path.join(self.directory, 'journal.log')
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    # A crash mid-write can leave a torn last line; it is simply redone
+                    if line.endswith('\n') and '\t' in line:
+                        status, item = line.rstrip('\n').split('\t', 1)
+                        done[item] = status
+        return done
+
+    def succeeded(self):
+        """
+        Returns the items whose latest journal entry is 'ok'.
+        """
+        return {item for item, status in self.completed().items() if status == 'ok'}
+
+    def pending(self):
+        """
+        Returns the queued items not yet handled successfully, in order. Items that
+        failed (e.g. retries ran out at the rate limit) stay pending and are retried.
+        """
+        done = self.succeeded()
+        return [item for item in self.items() if item not in done]
+
+    def add_item(self, item):
+        """
+        Appends one item to an open queue.
+        """
+        with self._lock:
+            if self._queue is None:
+                self._queue = open(os.path.join(self.directory, 'queue.txt'), 'a', encoding='utf-8')
+            self._queue.write(f'{item}\n')
+            self._queue.flush()
+            self.meta['total'] += 1
+
+    def close_queue(self):
+        """
+        Records that every item has been queued, so a resume only needs the pending ones.
+        """
+        with self._lock:
+            if self._queue is not None:
+                self._queue.close()
+                self._queue = None
+            self.meta['queue_closed'] = True
+            # The in-memory count misses items queued before a resume
+            self.meta['total'] = len(self.items())
+            self._write_meta()
+
+    def mark_done(self, item, status='ok'):
+        """
+        Appends a completed item to the journal and flushes it to disk.
+        """
+        with self._lock:
+            if self._journal is None:
+                self._journal = open(os.path.join(self.directory, 'journal.log'), 'a', encoding='utf-8')
+            self._journal.write(f'{status}\t{item}\n')
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+
+    def finish(self):
+        """
+        Marks the job as complete so it is no longer offered for resuming, unless some
+        items failed: the job then stays unfinished so a resume retries them.
+        Returns True if the job is complete.
+        """
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if self._queue is not None:
+                self._queue.close()
+                self._queue = None
+            self.meta['queue_closed'] = True
+            self.meta['finished'] = not self.pending()
+            self._write_meta()
+            return self.meta['finished']
+
+    def discard(self):
+        """
+        Deletes the job and its journal.
+        """
+        with self._lock:
+            for handle in (self._journal, self._queue):
+                if handle is not None:
+                    handle.close()
+            self._journal = self._queue = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def describe(self):
+        details = ', '.join(f'{key}={value}' for key, value in self.params.items())
+        done = len(self.succeeded())
+        total = f"{self.meta['total']}" if self.queue_closed else f"{len(self.items())}+"
+        return f"{self.kind} job ({details}): {done}/{total} done"
+
+
+def unfinished_jobs(jobs_dir=None):
+    """
+    Returns every job on disk that has not finished, oldest first.
+    """
+    jobs_dir = jobs_dir or get_config().jobs_dir
+    if not os.path.isdir(jobs_dir):
+        return []
+    jobs = []
+    for name in sorted(os.listdir(jobs_dir)):
+        directory = os.path.join(jobs_dir, name)
+        try:
+            job = Job.load(directory)
+        except (OSError, ValueError):
+            continue
+        if not job.meta.get('finished'):
+            jobs.append(job)
+    return jobs
@@ -0,0 +1,78 @@
+# logging_config.py
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from scripts.config import get_config
+
+# Every module logs under this prefix, e.g. github_bot.follower_manager
+ROOT_LOGGER = 'github_bot'
+LOG_FILE = 'github_bot.log'
+# Records held in memory before they are written; warnings and errors are written at once
+LOG_BUFFER_SIZE = 256
+
+_listener = None
+
+
+def get_logger(name):
+    """
+    Returns the logger for one part of the bot (e.g. 'follower_manager').
+    """
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+def setup_logging(level=logging.INFO, config=None):
+    """
+    Sets up logging once for the whole bot.
+    Callers only pay for putting a record on a queue; a background listener thread
+    formats the records and writes them in batches to a log file in config.log_dir that
+    rotates at config.log_max_bytes. Warnings and errors are also shown on stderr.
+    Safe to call more than once. Returns the root 'github_bot' logger.
+    """
+    global _listener
+    root = logging.getLogger(ROOT_LOGGER)
+    if _listener is not None:
+        return root
+
+    config = config or get_config()
+    os.makedirs(config.log_dir, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        os.path.join(config.log_dir, LOG_FILE), maxBytes=config.log_max_bytes,
+        backupCount=config.log_backup_count, encoding='utf-8'
+    )
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    buffered = logging.handlers.MemoryHandler(LOG_BUFFER_SIZE, flushLevel=logging.WARNING, target=file_handler)
+
+    console = logging.StreamHandler(sys.stderr)
+    console.setLevel(logging.WARNING)
+    console.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, buffered, console, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return root
+
+
+def shutdown_logging():
+    """
+    Stops the listener thread and flushes everything still buffered to disk.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
@@ -0,0 +1,247 @@
+# metrics.py
+
+import json
+import os
+import re
+import threading
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_ENDPOINT_PATTERNS = (
+    (re.compile(r'^user/(following|followers)/[^/]+$'), r'user/\1/{user}'),
+    (re.compile(r'^user/starred/[^/]+/[^/]+$'), 'user/starred/{owner}/{repo}'),
+    (re.compile(r'^users/[^/]+'), 'users/{user}'),
+    (re.compile(r'^repos/[^/]+/[^/]+'), 'repos/{owner}/{repo}'),
+)
+
+
+def endpoint_label(method, url):
+    """
+    Turns a request into a low-cardinality label such as 'GET users/{user}/followers',
+    dropping the host, the query string and user/repository names.
+    """
+    path = url.split('://', 1)[-1]
+    path = path.split('/', 1)[1] if '/' in path else ''
+    path = path.split('?', 1)[0].strip('/')
+    for pattern, replacement in _ENDPOINT_PATTERNS:
+        path = pattern.sub(replacement, path)
+    return f"{method.upper()} {path}"
+
+
+class _EndpointStats:
+    __slots__ = ('requests', 'statuses', 'buckets', 'latency_sum', 'latency_max', 'bytes',
+                 'cache_hits', 'cache_misses', 'retries', 'rate_limit_wait')
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.retries = 0
+        self.rate_limit_wait = 0.0
+
+    def percentile(self, fraction):
+        """
+        Upper bound of the histogram bucket holding the given fraction of requests.
+        """
+        target = self.requests * fraction
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.latency_max
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'statuses': dict(self.statuses),
+            'latency_sum': round(self.latency_sum, 6),
+            'latency_max': round(self.latency_max, 6),
+            'latency_p50': self.percentile(0.5),
+            'latency_p95': self.percentile(0.95),
+            'latency_buckets': dict(zip([str(b) for b in LATENCY_BUCKETS] + ['+Inf'], self.buckets)),
+            'bytes': self.bytes,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'retries': self.retries,
+            'rate_limit_wait': round(self.rate_limit_wait, 6),
+        }
+
+
+class Metrics:
+    """
+    Thread-safe per-endpoint counters for everything the GitHub client sends:
+    latency histogram, status codes, response bytes, ETag cache hits and 304s,
+    retries and time spent waiting on the rate limit governor.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+            self.started = time.time()
+
+    def _stats(self, label):
+        stats = self._endpoints.get(label)
+        if stats is None:
+            stats = self._endpoints[label] = _EndpointStats()
+        return stats
+
+    def observe(self, label, status, seconds, size=0):
+        """
+        Records one HTTP round trip. status is the status code, or the exception
+        class name if no response came back.
+        """
+        with self._lock:
+            stats = self._stats(label)
+            stats.requests += 1
+            stats.statuses[str(status)] = stats.statuses.get(str(status), 0) + 1
+            index = len(LATENCY_BUCKETS)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    index = i
+                    break
+            stats.buckets[index] += 1
+            stats.latency_sum += seconds
+            stats.latency_max = max(stats.latency_max, seconds)
+            stats.bytes += size
+
+    def record_retry(self, label):
+        with self._lock:
+            self._stats(label).retries += 1
+
+    def record_cache(self, label, hit):
+        with self._lock:
+            stats = self._stats(label)
+            if hit:
+                stats.cache_hits += 1
+            else:
+                stats.cache_misses += 1
+
+    def record_wait(self, label, seconds):
+        if seconds > 0:
+            with self._lock:
+                self._stats(label).rate_limit_wait += seconds
+
+    def snapshot(self):
+        """
+        Returns {label: stats dict} for every endpoint seen since the last reset.
+        """
+        with self._lock:
+            return {label: stats.as_dict() for label, stats in sorted(self._endpoints.items())}
+
+    def summary(self):
+        """
+        Formats the end-of-run table, slowest endpoints (by total time) first.
+        Returns an empty string if no request was sent.
+        """
+        endpoints = self.snapshot()
+        if not endpoints:
+            return ''
+        rows = sorted(endpoints.items(), key=lambda item: item[1]['latency_sum'], reverse=True)
+        header = (f"{'endpoint':<38} {'reqs':>6} {'2xx':>6} {'304':>5} {'4xx':>5} {'5xx':>4} "
+                  f"{'p50':>6} {'p95':>6} {'total s':>8} {'KB':>8} {'retry':>5} {'wait s':>7}")
+        lines = [header, '-' * len(header)]
+        totals = {'requests': 0, 'not_modified': 0, 'retries': 0, 'wait': 0.0, 'bytes': 0, 'time': 0.0}
+        for label, stats in rows:
+            statuses = stats['statuses']
+            count = lambda prefix: sum(n for code, n in statuses.items() if code.startswith(prefix))
+            lines.append(
+                f"{label[:38]:<38} {stats['requests']:>6} {count('2'):>6} {statuses.get('304', 0):>5} "
+                f"{count('4'):>5} {count('5'):>4} {stats['latency_p50']:>6.2f} {stats['latency_p95']:>6.2f} "
+                f"{stats['latency_sum']:>8.1f} {stats['bytes'] / 1024:>8.0f} {stats['retries']:>5} "
+                f"{stats['rate_limit_wait']:>7.1f}"
+            )
+            totals['requests'] += stats['requests']
+            totals['not_modified'] += statuses.get('304', 0)
+            totals['retries'] += stats['retries']
+            totals['wait'] += stats['rate_limit_wait']
+            totals['bytes'] += stats['bytes']
+            totals['time'] += stats['latency_sum']
+        lines.append(
+            f"{totals['requests']} requests ({totals['not_modified']} not modified), "
+            f"{totals['bytes'] / 1e6:.1f} MB, {totals['time']:.1f}s on the wire, "
+            f"{totals['retries']} retries, {totals['wait']:.1f}s rate limit wait "
+            f"in {time.time() - self.started:.1f}s"
+        )
+        return '\n'.join(lines)
+
+    def export(self, path, command=None):
+        """
+        Writes the metrics to `path`: a Prometheus textfile (replaced atomically) if it
+        ends in .prom, otherwise one JSON line per endpoint appended to the file, so
+        the history of earlier runs is kept.
+        """
+        if path.endswith('.prom'):
+            self.write_prometheus(path)
+        else:
+            self.append_jsonl(path, command)
+
+    def append_jsonl(self, path, command=None):
+        finished = time.time()
+        with open(path, 'a', encoding='utf-8') as f:
+            for label, stats in self.snapshot().items():
+                record = {'time': finished, 'started': self.started, 'command': command, 'endpoint': label}
+                record.update(stats)
+                f.write(json.dumps(record) + '\n')
+
+    def write_prometheus(self, path):
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP github_bot_{name} {help_text}")
+            lines.append(f"# TYPE github_bot_{name} {kind}")
+
+        def labels(endpoint, **extra):
+            method, _, route = endpoint.partition(' ')
+            pairs = {'method': method, 'endpoint': route or '/', **extra}
+            return '{' + ','.join(f'{key}="{value}"' for key, value in pairs.items()) + '}'
+
+        endpoints = self.snapshot()
+        metric('request_duration_seconds', 'histogram', 'GitHub API request latency.')
+        for label, stats in endpoints.items():
+            cumulative = 0
+            for bound, count in stats['latency_buckets'].items():
+                cumulative += count
+                lines.append(f"github_bot_request_duration_seconds_bucket{labels(label, le=bound)} {cumulative}")
+            lines.append(f"github_bot_request_duration_seconds_sum{labels(label)} {stats['latency_sum']}")
+            lines.append(f"github_bot_request_duration_seconds_count{labels(label)} {stats['requests']}")
+        metric('responses_total', 'counter', 'GitHub API responses by status code.')
+        for label, stats in endpoints.items():
+            for status, count in stats['statuses'].items():
+                lines.append(f"github_bot_responses_total{labels(label, status=status)} {count}")
+        for name, key, kind, help_text in (
+            ('response_bytes_total', 'bytes', 'counter', 'Response body bytes received.'),
+            ('cache_hits_total', 'cache_hits', 'counter', 'Pages answered from the ETag cache.'),
+            ('cache_misses_total', 'cache_misses', 'counter', 'Cacheable pages that had to be downloaded.'),
+            ('retries_total', 'retries', 'counter', 'Requests re-sent after an error.'),
+            ('rate_limit_wait_seconds_total', 'rate_limit_wait', 'counter', 'Time spent waiting on the rate limit.'),
+        ):
+            metric(name, kind, help_text)
+            for label, stats in endpoints.items():
+                lines.append(f"github_bot_{name}{labels(label)} {stats[key]}")
+
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temp_path, path)
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """
+    Returns the process-wide Metrics that the shared client records into.
+    """
+    return _metrics
@@ -0,0 +1,103 @@
+# pagination.py
+
+import collections
+import concurrent.futures
+from urllib.parse import parse_qs, urlencode, urlparse
+from scripts.users import UserList, project_users
+
+PER_PAGE = 100  # Maximum allowed per_page for GitHub API
+DEFAULT_PAGE_WORKERS = 8
+
+
+def page_url(path, page, per_page=PER_PAGE, params=None):
+    """
+    Builds the URL of one page of a list endpoint.
+    """
+    query = dict(params or {})
+    query.update({'per_page': per_page, 'page': page})
+    separator = '&' if '?' in path else '?'
+    return f'{path}{separator}{urlencode(query)}'
+
+
+def last_page_number(links):
+    """
+    Reads the page number of the rel="last" link, or None if GitHub did not send one.
+    """
+    last = links.get('last')
+    if not last:
+        return None
+    pages = parse_qs(urlparse(last['url']).query).get('page')
+    return int(pages[0]) if pages else None
+
+
+def read_window(client, max_workers):
+    """
+    How many pages may be fetched ahead: max_workers, capped by the client's current
+    adaptive 'read' limit so paginated reads back off with the rest of the reads.
+    """
+    concurrency = getattr(client, 'concurrency', None)
+    if concurrency is None:
+        return max_workers
+    return max(1, min(max_workers, concurrency.current('read')))
+
+
+def iter_pages(client, path, params=None, per_page=PER_PAGE, cache=True, max_workers=DEFAULT_PAGE_WORKERS,
+               project=None):
+    """
+    Yields (page_number, items) for every page of a GitHub list endpoint, fetching up to
+    max_workers pages ahead in parallel. project, if given, turns each parsed page into
+    what is yielded (e.g. project_users). Raises requests.exceptions.RequestException on a failed page.
+    """
+    def fetch(url):
+        response = client.get(url, cache=cache)
+        response.raise_for_status()
+        data = response.json()
+        # A page rebuilt from the cache keeps its stored Link header if the 304 sent none,
+        # so a full cached page without rel="next" may predate the list growing past it
+        unsure = getattr(response, 'from_cache', False) and len(data) >= per_page
+        # Projecting in the fetch worker keeps pages waiting to be consumed small
+        return response.links, unsure, project(data) if project is not None else data
+
+    links, unsure, items = fetch(page_url(path, 1, per_page, params))
+    yield 1, items
+    page = 1
+
+    last_page = last_page_number(links)
+    if last_page is not None:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # At most max_workers (or the current adaptive 'read' limit) pages ahead of
+            # the consumer, so a slow consumer holds back the fetching
+            window = collections.deque()
+            next_page = 2
+            try:
+                for page in range(2, last_page + 1):
+                    while next_page <= last_page and len(window) < read_window(client, max_workers):
+                        window.append(executor.submit(fetch, page_url(path, next_page, per_page, params)))
+                        next_page += 1
+                    links, unsure, items = window.popleft().result()
+                    yield page, items
+            finally:
+                # Abandoned early (error or consumer stopped): skip pages not started yet
+                for future in window:
+                    future.cancel()
+
+    while 'next' in links or unsure:
+        page += 1
+        links, unsure, items = fetch(links['next']['url'] if 'next' in links else page_url(path, page, per_page, params))
+        if not items:
+            break
+        yield page, items
+
+
+def fetch_users(client, path, logger, description, params=None, per_page=PER_PAGE, cache=True):
+    """
+    Collects every user of a user list endpoint, logging each page, keeping only each
+    user's login and id in a compact UserList instead of the full JSON dicts.
+    Raises requests.exceptions.RequestException on a failed page.
+    """
+    users = UserList()
+    for page, data in iter_pages(client, path, params=params, per_page=per_page, cache=cache,
+                                 project=project_users):
+        users.extend(data)
+        logger.info(f"Fetched {len(data)} {description} on page {page}")
+    return users
@@ -0,0 +1,165 @@
+# pipeline.py
+
+import asyncio
+import time
+from scripts.logging_config import get_logger
+
+# Seconds between log lines with the queue depths of a running pipeline
+MONITOR_INTERVAL = 10.0
+
+
+class Stage:
+    """
+    One step of a Pipeline: `workers` copies of `worker(item, emit)` pulling from a bounded
+    input queue of `queue_size` items. A worker passes results downstream with
+    `await emit(result)`, which blocks while the next stage's queue is full, so a slow
+    stage holds back the ones before it instead of letting work pile up in memory.
+    """
+
+    def __init__(self, name, worker, workers=1, queue_size=None):
+        self.name = name
+        self.worker = worker
+        self.workers = max(1, workers)
+        self.queue_size = queue_size or 4 * self.workers
+        self.received = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy = 0.0
+        # Part of busy spent waiting for room in the next stage's queue
+        self.blocked = 0.0
+        self.max_depth = 0
+        self._depth_total = 0
+        self.started = None
+        self.finished = None
+
+    def observe_depth(self, depth):
+        self.received += 1
+        self._depth_total += depth
+        self.max_depth = max(self.max_depth, depth)
+
+    def stats(self, elapsed):
+        active = (self.finished or time.monotonic()) - self.started if self.started is not None else 0.0
+        return {
+            'stage': self.name,
+            'workers': self.workers,
+            'received': self.received,
+            'emitted': self.emitted,
+            'errors': self.errors,
+            'per_second': self.received / active if active > 0 else 0.0,
+            'utilization': (self.busy - self.blocked) / (self.workers * elapsed) if elapsed > 0 else 0.0,
+            'blocked': self.blocked / (self.workers * elapsed) if elapsed > 0 else 0.0,
+            'queue_avg': self._depth_total / self.received if self.received else 0.0,
+            'queue_max': self.max_depth,
+            'queue_size': self.queue_size,
+        }
+
+
+class Pipeline:
+    """
+    Runs items through a chain of Stages connected by bounded asyncio queues, so every
+    stage works at the same time (e.g. fetching pages while earlier users are being
+    followed). A worker exception is logged and counted against its stage; the item is
+    dropped and the pipeline keeps going. Per-stage throughput, utilization and queue
+    depth are available from stats() and report() afterwards; a stage that spends much
+    of its time blocked is waiting on a slower stage after it.
+    """
+
+    def __init__(self, stages, logger=None):
+        self.stages = stages
+        self.logger = logger or get_logger('pipeline')
+        self.started = None
+        self.finished = None
+        self._queues = []
+
+    async def run(self, source):
+        """
+        Feeds every item of `source` (a regular or async iterable) into the first stage and
+        returns once all stages have drained.
+        """
+        self.started = time.monotonic()
+        self._queues = [asyncio.Queue(stage.queue_size) for stage in self.stages]
+        workers = [
+            [asyncio.ensure_future(self._work(index)) for _ in range(stage.workers)]
+            for index, stage in enumerate(self.stages)
+        ]
+        monitor = asyncio.ensure_future(self._monitor())
+        try:
+            if hasattr(source, '__aiter__'):
+                async for item in source:
+                    await self._put(0, item)
+            else:
+                for item in source:
+                    await self._put(0, item)
+            # Stage i is done once its queue is empty and its workers idle; only then can
+            # stage i + 1 receive nothing more
+            for index, stage in enumerate(self.stages):
+                await self._queues[index].join()
+                stage.finished = time.monotonic()
+                for task in workers[index]:
+                    task.cancel()
+                await asyncio.gather(*workers[index], return_exceptions=True)
+        finally:
+            monitor.cancel()
+            for tasks in workers:
+                for task in tasks:
+                    task.cancel()
+            self.finished = time.monotonic()
+
+    async def _put(self, index, item):
+        queue = self._queues[index]
+        await queue.put(item)
+        self.stages[index].observe_depth(queue.qsize())
+
+    async def _work(self, index):
+        stage = self.stages[index]
+        queue = self._queues[index]
+        last = index == len(self.stages) - 1
+
+        async def emit(result):
+            stage.emitted += 1
+            if not last:
+                waiting = time.monotonic()
+                await self._put(index + 1, result)
+                stage.blocked += time.monotonic() - waiting
+
+        while True:
+            item = await queue.get()
+            if stage.started is None:
+                stage.started = time.monotonic()
+            begun = time.monotonic()
+            try:
+                await stage.worker(item, emit)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stage.errors += 1
+                self.logger.error(f"Pipeline stage {stage.name} failed on {item!r}: {e}")
+            finally:
+                stage.busy += time.monotonic() - begun
+                queue.task_done()
+
+    async def _monitor(self):
+        while True:
+            await asyncio.sleep(MONITOR_INTERVAL)
+            depths = ', '.join(f"{stage.name}={queue.qsize()}/{stage.queue_size}"
+                               for stage, queue in zip(self.stages, self._queues))
+            self.logger.info(f"Pipeline queue depths: {depths}")
+
+    def stats(self):
+        elapsed = (self.finished or time.monotonic()) - self.started if self.started is not None else 0.0
+        return [stage.stats(elapsed) for stage in self.stages]
+
+    def report(self):
+        """
+        Formats the per-stage statistics as a table.
+        """
+        header = (f"{'stage':<14} {'workers':>7} {'in':>7} {'out':>7} {'errors':>6} {'items/s':>8} "
+                  f"{'busy %':>6} {'blocked %':>9} {'queue avg':>9} {'max':>5}")
+        lines = [header, '-' * len(header)]
+        for stats in self.stats():
+            lines.append(
+                f"{stats['stage']:<14} {stats['workers']:>7} {stats['received']:>7} {stats['emitted']:>7} "
+                f"{stats['errors']:>6} {stats['per_second']:>8.1f} {stats['utilization'] * 100:>6.0f} "
+                f"{stats['blocked'] * 100:>9.0f} {stats['queue_avg']:>9.1f} {stats['queue_max']:>5}"
+            )
+        return '\n'.join(lines)
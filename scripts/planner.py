@@ -0,0 +1,213 @@
+# planner.py
+
+import json
+import math
+import os
+import time
+import requests  # type: ignore
+from scripts.config import DEFAULT_RESERVE, DEFAULT_WRITE_INTERVAL
+
+PLAN_VERSION = 1
+RATE_LIMIT_WINDOW = 3600
+PER_PAGE = 100
+
+
+def plan_unfollow(store, login):
+    """
+    Plans unfollowing everyone `login` follows who does not follow back,
+    as a set difference over the locally synced following and followers lists.
+    The follow-back status may come from a full followers sync or from the GraphQL
+    mutual sync; the snapshot ages report whichever is newer.
+    """
+    followers_age = store.snapshot_age('followers:' + login)
+    mutual_age = store.snapshot_age('mutual:' + login)
+    use_mutual = mutual_age is not None and (followers_age is None or mutual_age < followers_age)
+    following = store.following(login)
+    followers = store.followers(login)
+    non_mutuals = sorted(following - followers)
+    counts = {'following': len(following), 'mutual': len(following & followers), 'non_mutual': len(non_mutuals)}
+    if not use_mutual:
+        # The GraphQL sync only knows about followers you also follow
+        counts['followers'] = len(followers)
+    return _plan('unfollow', login, {'user': login}, non_mutuals, counts, store,
+                 ['following:' + login, ('mutual:' if use_mutual else 'followers:') + login],
+                 requests_per_item=1, writes_per_item=1)
+
+
+class CandidateFilter:
+    """
+    Decides which followers of the targets a follow run handles, for both the planner and
+    the follow pipeline: each user once across all targets, never yourself or anyone in
+    `following`. Counts what it sees in `counts`.
+    """
+
+    def __init__(self, login, following):
+        self.login = login
+        self.following = following
+        self.counts = {'target_followers': 0, 'already_followed': 0, 'overlapping': 0, 'new': 0}
+        self._seen = {}
+
+    def check(self, target, username):
+        """
+        Returns True if username, a follower of target, is a new candidate.
+        """
+        first = self._seen.get(username)
+        if first == target:
+            # Listed twice by one target (its pages shifted while being read)
+            return False
+        self.counts['target_followers'] += 1
+        if first is not None:
+            self.counts['overlapping'] += 1
+            return False
+        self._seen[username] = target
+        if username == self.login or username in self.following:
+            self.counts['already_followed'] += 1
+            return False
+        self.counts['new'] += 1
+        return True
+
+
+def plan_follow(store, login, targets, should_star=True):
+    """
+    Plans following the followers of every target that pass the CandidateFilter;
+    users following several targets are counted once and reported as overlapping.
+    """
+    candidate_filter = CandidateFilter(login, store.following(login))
+    candidates = [username for target in targets for username in store.iter_followers(target)
+                  if candidate_filter.check(target, username)]
+    counts = candidate_filter.counts
+    snapshots = ['following:' + login] + [f'followers:{target}' for target in targets]
+    if should_star:
+        snapshots.append('starred')
+    # Follow PUT, then a repository listing and at most one star PUT per user when starring
+    return _plan('follow', login, {'target': ','.join(targets), 'should_star': should_star}, candidates,
+                 counts, store, snapshots, requests_per_item=3 if should_star else 1,
+                 writes_per_item=2 if should_star else 1)
+
+
+def plan_unstar(store, login):
+    """
+    Plans unstarring every repository in the local starred snapshot, plus the
+    verification pass that re-lists your stars afterwards.
+    """
+    repos = sorted(f'{owner}/{repo}' for owner, repo in store.starred())
+    return _plan('unstar', login, {'user': login}, repos, {'starred': len(repos)}, store, ['starred'],
+                 requests_per_item=1, writes_per_item=1, extra_requests=math.ceil(len(repos) / PER_PAGE))
+
+
+def _plan(kind, login, params, items, counts, store, snapshots, requests_per_item, writes_per_item,
+          extra_requests=0):
+    return {
+        'version': PLAN_VERSION,
+        'kind': kind,
+        'user': login,
+        'created': time.time(),
+        'params': params,
+        'counts': counts,
+        # Seconds since each list the plan is based on was synced (None: never synced)
+        'snapshots': {name: store.snapshot_age(name) for name in snapshots},
+        'requests': len(items) * requests_per_item + extra_requests,
+        'writes': len(items) * writes_per_item,
+        'items': items,
+    }
+
+
+def rate_limit_headroom(client):
+    """
+    Returns {'limit', 'remaining', 'reset'} for the core REST budget.
+    GET /rate_limit does not count against the limit. Falls back to what the
+    governor has seen so far, or None if nothing is known.
+    """
+    try:
+        response = client.get('rate_limit')
+        if response.status_code == 200:
+            data = response.json()
+            core = data.get('resources', {}).get('core') or data.get('rate')
+            if core:
+                return {'limit': core['limit'], 'remaining': core['remaining'], 'reset': core['reset']}
+    except (requests.exceptions.RequestException, ValueError, KeyError):
+        pass
+    remaining, reset = client.rate_limiter.snapshot('core')
+    if remaining is None:
+        return None
+    return {'limit': None, 'remaining': remaining, 'reset': reset}
+
+
+def estimate(plan, headroom, write_interval=DEFAULT_WRITE_INTERVAL, reserve=DEFAULT_RESERVE):
+    """
+    Adds an ETA to the plan: writes are spaced by the governor's write interval, and
+    requests beyond the remaining budget wait for one or more rate limit resets.
+    """
+    seconds = plan['writes'] * write_interval
+    windows = 0
+    if headroom is not None:
+        available = max(0, headroom['remaining'] - reserve)
+        if plan['requests'] > available:
+            per_window = max(1, (headroom['limit'] or 5000) - reserve)
+            windows = math.ceil((plan['requests'] - available) / per_window)
+            wait = max(0.0, headroom['reset'] - time.time()) + (windows - 1) * RATE_LIMIT_WINDOW
+            seconds = max(seconds, wait)
+    plan['estimate'] = {'eta_seconds': round(seconds), 'rate_limit_windows': windows, 'headroom': headroom}
+    return plan
+
+
+def describe(plan):
+    """
+    Formats a plan as a short human-readable report.
+    """
+    lines = [f"Plan: {plan['kind']} ({', '.join(f'{k}={v}' for k, v in plan['params'].items())})"]
+    lines.extend(f"  {name.replace('_', ' ')}: {value}" for name, value in plan['counts'].items())
+    for name, age in plan['snapshots'].items():
+        synced = 'never synced' if age is None else f"synced {_duration(age)} ago"
+        lines.append(f"  snapshot {name}: {synced}")
+    lines.append(f"  actions: {len(plan['items'])}, estimated requests: {plan['requests']} "
+                 f"({plan['writes']} writes)")
+    eta = plan.get('estimate')
+    if eta is not None:
+        headroom = eta['headroom']
+        budget = 'unknown' if headroom is None else f"{headroom['remaining']} requests left"
+        lines.append(f"  rate limit: {budget}; estimated time: {_duration(eta['eta_seconds'])}"
+                     + (f" (waits for {eta['rate_limit_windows']} reset(s))" if eta['rate_limit_windows'] else ''))
+    if plan['items']:
+        preview = ', '.join(plan['items'][:10])
+        more = f" and {len(plan['items']) - 10} more" if len(plan['items']) > 10 else ''
+        lines.append(f"  first: {preview}{more}")
+    return '\n'.join(lines)
+
+
+def _duration(seconds):
+    seconds = int(seconds)
+    if seconds < 120:
+        return f"{seconds}s"
+    if seconds < 7200:
+        return f"{seconds // 60}m"
+    return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m"
+
+
+def save_plan(plan, path):
+    """
+    Writes a plan to disk atomically.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_plan(path, max_age=None):
+    """
+    Reads a saved plan. Raises ValueError if it is not a plan this version understands
+    or is older than max_age seconds (None accepts any age). Saved plans are refused
+    once stale because the graph may have moved on.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        plan = json.load(f)
+    if plan.get('version') != PLAN_VERSION or plan.get('kind') not in ('follow', 'unfollow', 'unstar'):
+        raise ValueError(f"{path} is not a saved plan")
+    age = time.time() - plan['created']
+    if max_age is not None and age > max_age:
+        raise ValueError(f"Plan {path} is {_duration(age)} old; sync and plan again, or pass --force")
+    return plan
@@ -0,0 +1,66 @@
+# progress.py
+
+import sys
+import time
+
+# Seconds between redraws, so thousands of updates per second cost a few terminal writes
+REFRESH_INTERVAL = 0.25
+
+
+class _TextProgress:
+    """
+    Minimal stand-in for tqdm when it is not installed: one status line on stderr,
+    redrawn at most every REFRESH_INTERVAL seconds.
+    """
+
+    def __init__(self, desc, total=None, unit='it'):
+        self.desc = desc
+        self.total = total
+        self.unit = unit
+        self.n = 0
+        self.postfix = ''
+        self._last_draw = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, n=1):
+        self.n += n
+        if time.monotonic() - self._last_draw >= REFRESH_INTERVAL:
+            self.refresh()
+
+    def set_postfix_str(self, postfix, refresh=True):
+        self.postfix = postfix
+        if refresh:
+            self.refresh()
+
+    def reset(self, total=None):
+        self.n = 0
+        if total is not None:
+            self.total = total
+
+    def refresh(self):
+        self._last_draw = time.monotonic()
+        total = f"/{self.total}" if self.total else ''
+        postfix = f" [{self.postfix}]" if self.postfix else ''
+        sys.stderr.write(f"\r{self.desc}: {self.n}{total} {self.unit}{postfix}")
+        sys.stderr.flush()
+
+    def close(self):
+        self.refresh()
+        sys.stderr.write('\n')
+
+
+def progress_bar(desc, total=None, unit='user'):
+    """
+    Returns a progress display (tqdm if available) that redraws a few times per second
+    at most, to replace per-item print lines in hot loops.
+    """
+    try:
+        from tqdm import tqdm
+    except ImportError:
+        return _TextProgress(desc, total=total, unit=unit)
+    return tqdm(desc=desc, total=total, unit=unit, mininterval=REFRESH_INTERVAL, file=sys.stderr)
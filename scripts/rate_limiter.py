@@ -0,0 +1,153 @@
+# rate_limiter.py
+
+import threading
+import time
+from scripts.config import DEFAULT_RESERVE, DEFAULT_WRITE_INTERVAL
+from scripts.logging_config import get_logger
+
+# Below this share of the hourly budget, requests are spread evenly until the reset
+PACING_THRESHOLD = 0.2
+# Fallback wait when a secondary limit response carries no Retry-After header
+SECONDARY_LIMIT_BACKOFF = 60
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+def resource_for(path):
+    """
+    Maps a request path to the GitHub rate limit resource it is billed against.
+    """
+    path = path.split('://', 1)[-1]
+    if '/graphql' in path or path.startswith('graphql'):
+        return 'graphql'
+    if '/search/' in path or path.startswith('search/'):
+        return 'search'
+    return 'core'
+
+
+class _Bucket:
+    """
+    Primary rate limit state for one resource, as last reported by GitHub.
+    """
+    __slots__ = ('limit', 'remaining', 'used', 'reset', 'next_slot')
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.used = None
+        self.reset = None
+        self.next_slot = 0.0
+
+
+class RateLimitGovernor:
+    """
+    Thread-safe pacing for GitHub API calls.
+    Fed by the X-RateLimit-* and Retry-After headers of every response. Requests run at
+    full speed while the primary budget is healthy; once it runs low the rest is spread
+    evenly until the reset time. Write requests are spaced out for the secondary limit and
+    all callers are blocked after a 403/429 until GitHub allows traffic again.
+    """
+
+    def __init__(self, reserve=DEFAULT_RESERVE, write_interval=DEFAULT_WRITE_INTERVAL, logger=None):
+        self.reserve = reserve
+        self.write_interval = write_interval
+        self.logger = logger or get_logger('rate_limiter')
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._blocked_until = 0.0
+        self._next_write = 0.0
+
+    def _bucket(self, resource):
+        bucket = self._buckets.get(resource)
+        if bucket is None:
+            bucket = self._buckets[resource] = _Bucket()
+        return bucket
+
+    def _reserve_slot(self, method, resource):
+        """
+        Claims the next send time for a request and returns how long the caller must wait.
+        """
+        now = time.time()
+        with self._lock:
+            start = max(now, self._blocked_until)
+            bucket = self._bucket(resource)
+
+            if bucket.remaining is not None and bucket.reset is not None:
+                if bucket.reset <= now:
+                    # Window rolled over; the next response will report the new budget
+                    bucket.remaining = None
+                elif bucket.remaining <= self.reserve:
+                    start = max(start, bucket.reset + 1)
+                else:
+                    if bucket.limit and bucket.remaining < bucket.limit * PACING_THRESHOLD:
+                        # Budget running low: spread what is left evenly over the rest of the window
+                        interval = (bucket.reset - now) / (bucket.remaining - self.reserve)
+                        start = max(start, bucket.next_slot)
+                        bucket.next_slot = start + interval
+                    bucket.remaining -= 1
+
+            # GraphQL queries are POSTs but do not create content
+            if method.upper() in WRITE_METHODS and resource != 'graphql':
+                start = max(start, self._next_write)
+                self._next_write = start + self.write_interval
+
+            return start - now
+
+    def acquire(self, method, path):
+        """
+        Blocks until a request may be sent without exceeding either rate limit.
+        Returns the number of seconds waited.
+        """
+        delay = self._reserve_slot(method, resource_for(path))
+        if delay <= 0:
+            return 0.0
+        if delay > 5:
+            self.logger.info(f"Rate limit governor waiting {delay:.1f}s before next request.")
+        time.sleep(delay)
+        return delay
+
+    def update(self, response):
+        """
+        Updates the limits from a response. Returns True if the response was rate limited
+        and the request should be sent again.
+        """
+        headers = response.headers
+        now = time.time()
+        limited = False
+
+        with self._lock:
+            resource = headers.get('X-RateLimit-Resource') or resource_for(response.url or '')
+            bucket = self._bucket(resource)
+            if 'X-RateLimit-Remaining' in headers:
+                bucket.remaining = int(headers['X-RateLimit-Remaining'])
+                bucket.limit = int(headers.get('X-RateLimit-Limit', bucket.limit or 0))
+                bucket.used = int(headers.get('X-RateLimit-Used', bucket.used or 0))
+                bucket.reset = int(headers.get('X-RateLimit-Reset', bucket.reset or now))
+
+            if response.status_code in (403, 429):
+                retry_after = headers.get('Retry-After')
+                if retry_after is not None:
+                    # Secondary limit: GitHub tells us exactly how long to back off
+                    self._blocked_until = max(self._blocked_until, now + int(retry_after))
+                    limited = True
+                elif bucket.remaining == 0 and bucket.reset:
+                    # Primary limit exhausted
+                    self._blocked_until = max(self._blocked_until, bucket.reset + 1)
+                    limited = True
+                elif response.status_code == 429 or 'secondary rate limit' in response.text.lower():
+                    self._blocked_until = max(self._blocked_until, now + SECONDARY_LIMIT_BACKOFF)
+                    limited = True
+
+        if limited:
+            self.logger.warning(
+                f"Rate limited ({response.status_code}) on {response.url}; "
+                f"pausing until {time.strftime('%H:%M:%S', time.localtime(self._blocked_until))}."
+            )
+        return limited
+
+    def snapshot(self, resource='core'):
+        """
+        Returns (remaining, reset_time) for a resource, or (None, None) if not yet known.
+        """
+        with self._lock:
+            bucket = self._bucket(resource)
+            return bucket.remaining, bucket.reset
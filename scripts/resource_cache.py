@@ -0,0 +1,208 @@
+# resource_cache.py
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from scripts.config import DEFAULT_MAX_ENTRIES, DEFAULT_TTLS, get_config
+
+# Disk writes are batched into one transaction per this many new entries
+FLUSH_EVERY = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+"""
+
+
+class _KindStats:
+    __slots__ = ('hits', 'disk_hits', 'misses', 'expired', 'stores', 'evictions')
+
+    def __init__(self):
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class ResourceCache:
+    """
+    Bounded cache for decoded API resources (profiles, repository listings, repo existence)
+    shared by every module. Entries live in an in-memory LRU of at most max_entries and
+    expire after the TTL of their kind. With a path, entries are also kept in a small
+    SQLite file so the next session starts warm; memory misses fall through to it.
+    Unlike the ETag cache this answers without sending any request at all.
+    """
+
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES, ttls=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self._entries = OrderedDict()
+        # (kind, key) -> (stored_at, JSON) not yet written to disk
+        self._pending = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.executescript(SCHEMA)
+
+    def _kind_stats(self, kind):
+        stats = self._stats.get(kind)
+        if stats is None:
+            stats = self._stats[kind] = _KindStats()
+        return stats
+
+    def get(self, kind, key, default=None):
+        """
+        Returns the cached value, or default if it is missing or older than the kind's TTL.
+        """
+        now = time.time()
+        ttl = self.ttls.get(kind, 0)
+        with self._lock:
+            stats = self._kind_stats(kind)
+            entry = self._entries.get((kind, key))
+            if entry is not None:
+                if now - entry[0] < ttl:
+                    self._entries.move_to_end((kind, key))
+                    stats.hits += 1
+                    return entry[1]
+                del self._entries[(kind, key)]
+                stats.expired += 1
+            elif self.conn is not None:
+                row = self._pending.get((kind, key)) or self.conn.execute(
+                    'SELECT stored_at, value FROM resources WHERE kind = ? AND key = ?', (kind, key)
+                ).fetchone()
+                if row is not None and now - row[0] < ttl:
+                    value = json.loads(row[1])
+                    self._remember(kind, key, row[0], value)
+                    stats.disk_hits += 1
+                    return value
+                if row is not None:
+                    stats.expired += 1
+            stats.misses += 1
+            return default
+
+    def put(self, kind, key, value):
+        """
+        Caches a JSON-serializable value under (kind, key).
+        """
+        now = time.time()
+        with self._lock:
+            self._kind_stats(kind).stores += 1
+            self._remember(kind, key, now, value)
+            if self.conn is not None:
+                self._pending[(kind, key)] = (now, json.dumps(value))
+                if len(self._pending) >= FLUSH_EVERY:
+                    self._flush()
+
+    def _remember(self, kind, key, stored_at, value):
+        self._entries[(kind, key)] = (stored_at, value)
+        self._entries.move_to_end((kind, key))
+        while len(self._entries) > self.max_entries:
+            (evicted_kind, _), _ = self._entries.popitem(last=False)
+            self._kind_stats(evicted_kind).evictions += 1
+
+    def _flush(self):
+        if not self._pending:
+            return
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO resources (kind, key, stored_at, value) VALUES (?, ?, ?, ?)',
+                [(kind, key, stored_at, value) for (kind, key), (stored_at, value) in self._pending.items()]
+            )
+        self._pending = {}
+
+    def flush(self):
+        """
+        Writes entries still waiting for the disk layer.
+        """
+        with self._lock:
+            if self.conn is not None:
+                self._flush()
+
+    def stats(self):
+        """
+        Returns {kind: {'hits', 'disk_hits', 'misses', 'expired', 'stores', 'evictions'}}.
+        """
+        with self._lock:
+            return {kind: stats.as_dict() for kind, stats in sorted(self._stats.items())}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {}
+
+    def summary(self):
+        """
+        One line per kind that was looked up, e.g. "profile: 980/1000 served locally (12 from disk)".
+        Returns an empty string if the cache was not used.
+        """
+        lines = []
+        for kind, stats in self.stats().items():
+            lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+            if not lookups:
+                continue
+            served = stats['hits'] + stats['disk_hits']
+            lines.append(f"{kind}: {served}/{lookups} served locally ({stats['disk_hits']} from disk, "
+                         f"{stats['expired']} expired, {stats['evictions']} evicted)")
+        return '\n'.join(lines)
+
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                self._flush()
+                self.conn.close()
+                self.conn = None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_resource_cache():
+    """
+    Returns the shared ResourceCache, built from the config on first use.
+    Pending disk writes are flushed when the process exits.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            config = get_config()
+            _cache = ResourceCache(
+                config.resource_cache_db or None, max_entries=config.resource_cache_size,
+                ttls={'profile': config.profile_cache_ttl, 'repos': config.repo_cache_ttl,
+                      'repo_exists': config.repo_exists_ttl},
+            )
+            atexit.register(_cache.close)
+        return _cache
+
+
+def cache_summary(reset=False):
+    """
+    Returns the shared cache's summary ('' if it was never built), optionally
+    starting fresh counts for the next command.
+    """
+    if _cache is None:
+        return ''
+    summary = _cache.summary()
+    if reset:
+        _cache.reset_stats()
+    return summary
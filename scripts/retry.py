@@ -0,0 +1,130 @@
+# retry.py
+
+import random
+import threading
+import time
+import requests  # type: ignore
+from scripts.config import DEFAULT_MAX_ATTEMPTS, DEFAULT_RETRY_BUDGET
+
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+# Consecutive failures that open an endpoint's circuit, and how long it stays open
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+# Cooldowns a single request sits out before giving up on an open circuit
+MAX_CIRCUIT_WAITS = 3
+
+RETRYABLE_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+OK = 'ok'
+RETRYABLE = 'retryable'
+RATE_LIMITED = 'rate_limited'
+TERMINAL = 'terminal'
+AUTH = 'auth'
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """
+    Raised instead of sending a request to an endpoint whose circuit stayed open
+    through MAX_CIRCUIT_WAITS cooldowns.
+    Subclasses RequestException so existing error handling treats it like any failed call.
+    """
+
+
+def classify(response, rate_limited=False):
+    """
+    Sorts a response into ok, retryable (5xx), rate_limited (403/429 the governor
+    recognised as a limit), auth (401, other 403) or terminal (other 4xx such as 404/422).
+    """
+    status = response.status_code
+    if rate_limited:
+        return RATE_LIMITED
+    if status < 400:
+        return OK
+    if status >= 500:
+        return RETRYABLE
+    if status in (401, 403):
+        return AUTH
+    return TERMINAL
+
+
+def endpoint_key(method, url):
+    """
+    Groups requests by method and first path segment (e.g. 'GET users', 'PUT user')
+    so one failing endpoint does not trip the breaker of the others.
+    """
+    path = url.split('://', 1)[-1]
+    path = path.split('/', 1)[1] if '/' in path else ''
+    return f"{method.upper()} {path.split('?', 1)[0].split('/', 1)[0]}"
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, a per-run retry budget and a circuit breaker
+    per endpoint.
+    """
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, budget=DEFAULT_RETRY_BUDGET,
+                 base=BACKOFF_BASE, cap=BACKOFF_CAP, breaker_threshold=BREAKER_THRESHOLD,
+                 breaker_cooldown=BREAKER_COOLDOWN):
+        self.max_attempts = max_attempts
+        self.budget = budget
+        self.base = base
+        self.cap = cap
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._lock = threading.Lock()
+        self._failures = {}
+        self._open_until = {}
+        self.retries = 0
+
+    def reset(self):
+        """
+        Restores the full retry budget and closes every circuit, for the next run.
+        """
+        with self._lock:
+            self._failures = {}
+            self._open_until = {}
+            self.retries = 0
+
+    def delay(self, attempt):
+        """
+        Backoff before retry number `attempt` (1-based).
+        """
+        return random.uniform(0, min(self.cap, self.base * (2 ** attempt)))
+
+    def should_retry(self, attempt):
+        """
+        Consumes one retry from the run budget if attempts are left.
+        """
+        with self._lock:
+            if attempt >= self.max_attempts or self.retries >= self.budget:
+                return False
+            self.retries += 1
+            return True
+
+    def open_for(self, key):
+        """
+        Returns how many seconds the endpoint's circuit stays open (0 if closed). Once the
+        cooldown has passed, requests are let through again (half-open) until the next failure.
+        """
+        with self._lock:
+            return max(0.0, self._open_until.get(key, 0) - time.time())
+
+    def record_success(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+            self._open_until.pop(key, None)
+
+    def record_failure(self, key):
+        with self._lock:
+            failures = self._failures.get(key, 0) + 1
+            self._failures[key] = failures
+            if failures >= self.breaker_threshold:
+                # Half-open after the cooldown: a single further failure re-opens it
+                self._failures[key] = self.breaker_threshold - 1
+                self._open_until[key] = time.time() + self.breaker_cooldown
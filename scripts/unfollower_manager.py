@@ -1,119 +1,97 @@
 # unfollower_manager.py
 
-import time
 import requests  # type: ignore
-from scripts.github_utils import unfollow_user, headers, YOUR_USERNAME
-import logging
-import os
+from scripts.github_utils import unfollow_user, get_async_client, get_client, get_username
+from scripts.async_client import for_each, run_sync
+from scripts.config import get_config
+from scripts.graph_store import get_store, sync_following, sync_following_mutual, sync_followers
+from scripts.graphql import GraphQLError
+from scripts.jobs import Job
+from scripts.planner import plan_unfollow
+from scripts.logging_config import get_logger
+from scripts.progress import progress_bar
 
-def setup_logging():
-    """
-    Sets up logging for unfollower_manager.py.
-    Logs are stored in the 'logs' directory with the filename 'unfollower_manager.log'.
-    """
-    log_directory = "logs"
-    if not os.path.exists(log_directory):
-        os.makedirs(log_directory)
-
-    logger = logging.getLogger('unfollower_manager')
-    logger.setLevel(logging.INFO)
-
-    # Prevent adding multiple handlers if already set
-    if not logger.handlers:
-        fh = logging.FileHandler(os.path.join(log_directory, 'unfollower_manager.log'), mode='w')
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        fh.setFormatter(formatter)
-        logger.addHandler(fh)
-        logger.propagate = False
+logger = get_logger('unfollower_manager')
 
-    return logger
-
-def get_all_following(logger):
+def sync_follow_back_status(store, client, login):
     """
-    Retrieves all users that you are currently following with logging.
-    Handles pagination to ensure all users are fetched.
+    Refreshes who you follow and which of them follow you back.
+    Uses the GraphQL mutual sync (|following| / 100 queries) when enabled and falls back
+    to syncing the full following and followers lists over REST.
+    Raises requests.exceptions.RequestException if neither path succeeds.
     """
-    following_users = []
-    page = 1
-    while True:
-        following_url = f'https://api.github.com/user/following?page={page}'
+    if get_config().use_graphql:
         try:
-            response = requests.get(following_url, headers=headers)
-            response.raise_for_status()  # Raise exception for non-200 responses
-            data = response.json()
-            if not data:
-                logger.info(f"No more users found in following list on page {page}")
-                break
-            following_users.extend(data)
-            logger.info(f"Fetched {len(data)} users from following list on page {page}")
-            page += 1
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching following list: {str(e)}")
-            break
-    return following_users
+            logger.info('Syncing the users you follow and their follow-back status via GraphQL...')
+            sync_following_mutual(store, client, login, logger)
+            return
+        except (requests.exceptions.RequestException, GraphQLError) as e:
+            logger.warning(f"GraphQL follow-back sync failed, falling back to REST: {str(e)}")
+    logger.info('Syncing the list of users you are following...')
+    sync_following(store, client, login, logger)
+    logger.info('Syncing the list of your followers...')
+    sync_followers(store, client, login, logger)
 
-def get_all_followers(logger):
-    """
-    Retrieves all users that are following you with logging.
-    Handles pagination to ensure all followers are fetched.
-    """
-    followers = []
-    page = 1
-    while True:
-        followers_url = f'https://api.github.com/users/{YOUR_USERNAME}/followers?page={page}'
-        try:
-            response = requests.get(followers_url, headers=headers)
-            response.raise_for_status()  # Raise exception for non-200 responses
-            data = response.json()
-            if not data:
-                logger.info(f"No more followers found on page {page}")
-                break
-            followers.extend(data)
-            logger.info(f"Fetched {len(data)} followers on page {page}")
-            page += 1
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching followers: {str(e)}")
-            break
-    return followers
-
-def unfollow_script():
+def unfollow_script(job=None):
     """
     Script for unfollowing users who don't follow back, with logging.
+    The run is persisted as a job; pass an unfinished job to resume it with only the remaining users.
+    Returns the number of users unfollowed. Raises requests.exceptions.RequestException
+    if your following/followers lists cannot be synced.
     """
-    logger = logging.getLogger('unfollower_manager')
     logger.info('Starting Unfollow Script...')
     print("Running Unfollow Script...")
 
-    logger.info('Fetching the list of users you are following...')
-    following_users = get_all_following(logger)
-    logger.info(f'Fetched {len(following_users)} users from the following list.')
+    store = get_store()
+    client = get_client()
+    your_username = get_username()
+    if job is not None:
+        logger.info(f"Resuming job {job.id}: {job.describe()}")
+        return run_unfollow_job(job, store, logger)
+
+    try:
+        sync_follow_back_status(store, client, your_username)
+    except requests.exceptions.RequestException as e:
+        # Acting on a half-fetched followers list would unfollow people who do follow back
+        logger.error(f"Error syncing following/followers: {str(e)}")
+        raise
 
-    logger.info('Fetching the list of your followers...')
-    followers = get_all_followers(logger)
-    logger.info(f'Fetched {len(followers)} followers.')
+    plan = plan_unfollow(store, your_username)
+    counts = plan['counts']
+    logger.info(f"{counts['mutual']} of {counts['following']} users you follow follow you back.")
 
-    followers_set = {follower['login'] for follower in followers}
+    return run_unfollow_job(Job.create('unfollow', plan['params'], plan['items']), store, logger)
 
+def run_unfollow_job(job, store, logger):
+    """
+    Unfollows every user still pending in an unfollow job, journaling each one.
+    Returns the number of users unfollowed.
+    """
+    async_client = get_async_client()
+    your_username = get_username()
     unfollowed_count = 0
 
-    for user in following_users:
-        username = user['login']
-        if username not in followers_set:
-            logger.info(f'{username} does not follow you back. Attempting to unfollow...')
-            print(f"Unfollowing {username}...")
-            if unfollow_user(username):
-                unfollowed_count += 1
-                logger.info(f'Successfully unfollowed {username}')
-                print(f"Successfully unfollowed {username}")
-            else:
-                logger.error(f'Failed to unfollow {username}')
-                print(f"Failed to unfollow {username}")
+    async def process(username):
+        nonlocal unfollowed_count
+        unfollowed = await async_client.call('write', unfollow_user, username)
+        store.record_action('unfollow', username, unfollowed)
+        if unfollowed:
+            store.remove_edge(your_username, username)
+            unfollowed_count += 1
+            logger.info(f'Unfollowed {username} (did not follow you back)')
         else:
-            logger.info(f'{username} follows you back. No action taken.')
-            print(f"{username} follows you back. No action taken.")
-        # Add delay to avoid hitting rate limits
-        time.sleep(1)
+            logger.error(f'Failed to unfollow {username}')
+        job.mark_done(username, 'ok' if unfollowed else 'failed')
+        pbar.update(1)
+
+    pending = job.pending()
+    with progress_bar("Unfollowing", total=len(pending)) as pbar:
+        run_sync(for_each(pending, process, limit=async_client.limits['write']))
+    if not job.finish():
+        print(f"{len(job.pending())} users could not be unfollowed; resume the job to retry them "
+              f"(python main.py jobs --resume).")
 
     logger.info(f"Total users unfollowed: {unfollowed_count}")
     print(f"Total users unfollowed: {unfollowed_count}")
     logger.info('Unfollow Script completed.')
+    return unfollowed_count
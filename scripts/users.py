@@ -0,0 +1,67 @@
+# users.py
+
+import sys
+from array import array
+
+
+class UserList:
+    """
+    Compact list of GitHub users that keeps only what the bot reads: the login and the
+    numeric id. Logins are interned, so a name that appears in several lists (following,
+    followers, a target's followers) is stored once; ids live in a flat array('q').
+    Costs roughly 100 bytes per user instead of several KB for the full JSON dict.
+    Iterating yields logins.
+    """
+
+    __slots__ = ('logins', 'ids')
+
+    def __init__(self, users=()):
+        self.logins = []
+        self.ids = array('q')
+        self.extend(users)
+
+    def append(self, login, user_id=None):
+        self.logins.append(sys.intern(login))
+        # 0 stands for an unknown id
+        self.ids.append(user_id or 0)
+
+    def extend(self, users):
+        """
+        Adds users from another UserList, user JSON dicts or (login, id) pairs.
+        """
+        if isinstance(users, UserList):
+            self.logins.extend(users.logins)
+            self.ids.extend(users.ids)
+            return
+        for user in users:
+            if isinstance(user, dict):
+                self.append(user['login'], user.get('id'))
+            else:
+                self.append(*user)
+
+    def __len__(self):
+        return len(self.logins)
+
+    def __iter__(self):
+        return iter(self.logins)
+
+    def __getitem__(self, index):
+        return self.logins[index]
+
+    def records(self):
+        """
+        Yields (login, id) pairs, with None for unknown ids.
+        """
+        for login, user_id in zip(self.logins, self.ids):
+            yield login, user_id or None
+
+    def login_set(self):
+        return set(self.logins)
+
+
+def project_users(page):
+    """
+    Field projection for one page of user JSON: keeps only login and id, so the full
+    dicts can be freed as soon as the page is parsed.
+    """
+    return UserList(page)